@@ -23,10 +23,15 @@ from wikidated._utils.misc import (
     Hash,
     chunked,
     days_between_dates,
+    download_file_in_parts_with_progressbar,
     download_file_with_progressbar,
     external_process,
     hashcheck,
+    hashcompare,
     hashsum,
+    http_session,
+    json_dumps,
+    json_loads,
     months_between_dates,
     next_month,
 )
@@ -47,10 +52,15 @@ __all__ = [
     "Hash",
     "chunked",
     "days_between_dates",
+    "download_file_in_parts_with_progressbar",
     "download_file_with_progressbar",
     "external_process",
     "hashcheck",
+    "hashcompare",
     "hashsum",
+    "http_session",
+    "json_dumps",
+    "json_loads",
     "months_between_dates",
     "next_month",
     "ParallelizeExitWorkerFunc",
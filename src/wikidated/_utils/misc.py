@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import date, timedelta
 from errno import EEXIST
@@ -24,6 +26,7 @@ from subprocess import PIPE, Popen, TimeoutExpired
 from typing import (
     IO,
     TYPE_CHECKING,
+    Any,
     Iterable,
     Iterator,
     Optional,
@@ -32,14 +35,50 @@ from typing import (
     Union,
 )
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm  # type: ignore
 from typing_extensions import Protocol
+from urllib3.util.retry import Retry
+
+if sys.version_info >= (3, 8):
+    from importlib.metadata import PackageNotFoundError, version
+else:
+    from importlib_metadata import PackageNotFoundError, version
 
 _LOGGER = getLogger(__name__)
 
+try:
+    _WIKIDATED_VERSION = version("wikidated")
+except PackageNotFoundError:  # Not installed, e.g., when run from a source checkout.
+    _WIKIDATED_VERSION = "unknown"
+
 _T = TypeVar("_T")
 
+# Shared by all outgoing HTTP requests (and threads), so that connections are kept
+# alive and reused. Wikimedia asks clients to send a descriptive User-Agent and
+# throttles them with 429 responses, from which we back off as instructed by the
+# Retry-After header. All requests we send are read-only, so retrying POSTs is safe.
+http_session = requests.Session()
+http_session.headers["User-Agent"] = (
+    f"wikidated/{_WIKIDATED_VERSION} (https://github.com/lschmelzeisen/wikidated; "
+    "me@lschmelzeisen.com) " + requests.utils.default_user_agent()
+)
+_http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+    ),
+)
+http_session.mount("http://", _http_adapter)
+http_session.mount("https://", _http_adapter)
+
 
 # Adapted from: https://stackoverflow.com/a/66365466
 def chunked(iterable: Iterable[_T], size: int) -> Iterable[Sequence[_T]]:
@@ -47,6 +86,17 @@ def chunked(iterable: Iterable[_T], size: int) -> Iterable[Sequence[_T]]:
     return iter(lambda: tuple(islice(iterator, size)), ())
 
 
+def json_loads(value: Union[str, bytes]) -> Any:
+    # Parses JSON from bytes in a single pass, considerably faster than the stdlib.
+    return orjson.loads(value)
+
+
+def json_dumps(value: Any) -> str:
+    # orjson serializes datetimes natively, but not subclasses of tuple (e.g., the
+    # NamedTuples used for RDF triples), which are therefore passed as tuples.
+    return orjson.dumps(value, default=tuple).decode("UTF-8")
+
+
 def next_month(day: date) -> date:
     if day.month == 12:
         return date(year=day.year + 1, month=1, day=1)
@@ -72,20 +122,40 @@ def months_between_dates(start: date, stop: date) -> Sequence[date]:
     return results
 
 
+class Hash(Protocol):
+    @property
+    def name(self) -> str:
+        ...
+
+    def update(self, buffer: bytes) -> None:
+        ...
+
+    def hexdigest(self) -> str:
+        ...
+
+
 # Adapted from: https://stackoverflow.com/a/37573701/211404
 def download_file_with_progressbar(
-    url: str, dest: Union[Path, IO[bytes]], *, description: Optional[str] = None
+    url: str,
+    dest: Union[Path, IO[bytes]],
+    *,
+    description: Optional[str] = None,
+    h: Optional[Hash] = None,
+    display_progress_bar: bool = True,
 ) -> None:
+    # If h is given, it is updated with the downloaded bytes while they are written,
+    # saving an additional pass over the file to compute its hash afterwards.
     if isinstance(dest, Path):
         _LOGGER.debug(f"Downloading '{url}' to file '{dest}'.")
     else:
         _LOGGER.debug(f"Downloading '{url}'.")
 
-    response = requests.get(url, stream=True)
+    response = http_session.get(url, stream=True)
     response.raise_for_status()
 
     total_size = int(response.headers.get("content-length", 0))
-    chunk_size = 4 * 1024  # 4 KiB
+    # Large chunks, so that hashing (see above) operates on large buffers.
+    chunk_size = 1024 * 1024  # 1 MiB
 
     fd: IO[bytes]
     if isinstance(dest, Path):
@@ -102,9 +172,12 @@ def download_file_with_progressbar(
             unit_scale=True,
             unit_divisor=1024,
             dynamic_ncols=True,
+            disable=not display_progress_bar,
         ) as progress_bar:
             for chunk in response.iter_content(chunk_size):
                 bytes_written += fd.write(chunk)
+                if h is not None:
+                    h.update(chunk)
                 progress_bar.update(len(chunk))
     finally:
         if isinstance(dest, Path):
@@ -118,16 +191,106 @@ def download_file_with_progressbar(
         )
 
 
-class Hash(Protocol):
-    @property
-    def name(self) -> str:
-        ...
+def download_file_in_parts_with_progressbar(
+    url: str,
+    dest: Path,
+    *,
+    num_parts: int = 2,
+    description: Optional[str] = None,
+    display_progress_bar: bool = True,
+) -> None:
+    # A single connection often can not saturate the available bandwidth, so very
+    # large files are downloaded as contiguous byte ranges over multiple connections in
+    # parallel. Falls back to a single connection if the server does not support this.
+    response = http_session.head(url, allow_redirects=True)
+    response.raise_for_status()
+    total_size = int(response.headers.get("content-length", 0))
+    if response.headers.get("accept-ranges") != "bytes" or total_size == 0:
+        download_file_with_progressbar(
+            url,
+            dest,
+            description=description,
+            display_progress_bar=display_progress_bar,
+        )
+        return
 
-    def update(self, buffer: bytes) -> None:
-        ...
+    part_size = -(-total_size // num_parts)  # Ceil division.
+    chunk_size = 1024 * 1024  # 1 MiB
 
-    def hexdigest(self) -> str:
-        ...
+    def request_part(start: int, stop: int) -> requests.Response:
+        response = http_session.get(
+            url, headers={"Range": f"bytes={start}-{stop - 1}"}, stream=True
+        )
+        response.raise_for_status()
+        return response
+
+    # Some servers advertise Accept-Ranges but still answer range requests with the
+    # full file, so only start the remaining parts once the first one is confirmed to be
+    # served as partial content.
+    first_part_response = request_part(0, min(part_size, total_size))
+    if first_part_response.status_code != 206:
+        first_part_response.close()
+        download_file_with_progressbar(
+            url,
+            dest,
+            description=description,
+            display_progress_bar=display_progress_bar,
+        )
+        return
+
+    _LOGGER.debug(f"Downloading '{url}' to file '{dest}' in {num_parts} parts.")
+
+    with dest.open("wb") as fd:
+        fd.truncate(total_size)
+
+    with tqdm(
+        desc=description or "",
+        total=total_size,
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        dynamic_ncols=True,
+        disable=not display_progress_bar,
+    ) as progress_bar:
+
+        def download_part(
+            start: int, stop: int, response: Optional[requests.Response] = None
+        ) -> None:
+            if response is None:
+                response = request_part(start, stop)
+            if response.status_code != 206:
+                raise Exception(
+                    f"Server did not return partial content for '{url}', but status "
+                    f"{response.status_code}."
+                )
+
+            bytes_written = 0
+            with dest.open("r+b") as fd:
+                fd.seek(start)
+                for chunk in response.iter_content(chunk_size):
+                    bytes_written += fd.write(chunk)
+                    progress_bar.update(len(chunk))
+
+            if bytes_written != stop - start:
+                raise Exception(
+                    f"Size mismatch for bytes {start}-{stop - 1} downloaded from "
+                    f"'{url}', expected {stop - start} bytes got {bytes_written} bytes."
+                )
+
+        with ThreadPoolExecutor(max_workers=num_parts) as executor:
+            futures = [
+                executor.submit(
+                    download_part,
+                    start,
+                    min(start + part_size, total_size),
+                    first_part_response if start == 0 else None,
+                )
+                for start in range(0, total_size, part_size)
+            ]
+            for future in futures:
+                future.result()
+
+    _LOGGER.debug(f"Done downloading '{url}'.")
 
 
 def hashsum(file: Union[Path, IO[bytes]], h: Hash) -> str:
@@ -138,7 +301,9 @@ def hashsum(file: Union[Path, IO[bytes]], h: Hash) -> str:
         fd = file
 
     try:
-        for buffer in iter(lambda: fd.read(128 * 1024), b""):
+        # Reading large buffers amortizes the per-call overhead of h.update() and lets
+        # OpenSSL use its hardware-accelerated implementations to full effect.
+        for buffer in iter(lambda: fd.read(1024 * 1024), b""):  # 1 MiB
             h.update(buffer)
     finally:
         if isinstance(file, Path):
@@ -148,7 +313,12 @@ def hashsum(file: Union[Path, IO[bytes]], h: Hash) -> str:
 
 
 def hashcheck(file: Union[Path, IO[bytes]], h: Hash, expected: str) -> None:
-    actual = hashsum(file, h)
+    hashsum(file, h)
+    hashcompare(file, h, expected)
+
+
+def hashcompare(file: Union[Path, IO[bytes]], h: Hash, expected: str) -> None:
+    actual = h.hexdigest()
     if actual != expected:
         file_name = f"File '{file}'" if isinstance(file, Path) else "File"
         raise FileExistsError(
@@ -174,6 +344,7 @@ def external_process(
     stdout: Optional[int],
     stderr: Optional[int],
     cwd: Optional[Path] = None,
+    bufsize: int = -1,
     name: Optional[str] = None,
     exhaust_stdout_to_log: bool = False,
     exhaust_stderr_to_log: bool = False,
@@ -187,7 +358,13 @@ def external_process(
         _LOGGER.debug(f"Starting external process {name}: '{' '.join(args)}'")
 
     process = Popen(
-        args, stdin=stdin, stdout=stdout, stderr=stderr, cwd=cwd, encoding="UTF-8"
+        args,
+        stdin=stdin,
+        stdout=stdout,
+        stderr=stderr,
+        cwd=cwd,
+        bufsize=bufsize,
+        encoding="UTF-8",
     )
 
     try:
@@ -151,6 +151,7 @@ class SevenZipArchive:
             stdin=DEVNULL,
             stdout=PIPE,
             stderr=PIPE,
+            bufsize=1024 * 1024,  # Read decompressed output in 1 MiB blocks.
         ) as seven_zip_process:
             assert seven_zip_process.stdout is not None
             yield seven_zip_process.stdout
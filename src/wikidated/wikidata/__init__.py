@@ -15,6 +15,7 @@
 #
 
 from wikidated.wikidata.wikidata_api import WikidataApi
+from wikidated.wikidata.wikidata_api_cache import WikidataApiCache
 from wikidated.wikidata.wikidata_dump import (
     WIKIDATA_EARLIEST_REVISION_TIMESTAMP,
     WikidataDump,
@@ -41,6 +42,7 @@ from wikidated.wikidata.wikidata_revision_base import (
 
 __all__ = [
     "WikidataApi",
+    "WikidataApiCache",
     "WIKIDATA_EARLIEST_REVISION_TIMESTAMP",
     "WikidataDump",
     "WikidataDumpFile",
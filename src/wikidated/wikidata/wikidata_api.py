@@ -14,14 +14,30 @@
 # limitations under the License.
 #
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from logging import getLogger
-from typing import Iterable, Iterator, Mapping, Optional, Sequence, Union
+from typing import (
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import requests
 from pydantic import BaseModel as PydanticModel
 
-from wikidated._utils import chunked
+from wikidated._utils import chunked, http_session, json_loads
+from wikidated.wikidata.wikidata_api_cache import WikidataApiCache
 from wikidated.wikidata.wikidata_revision_base import (
     WikidataEntityMetadata,
     WikidataRevisionBase,
@@ -29,8 +45,17 @@ from wikidated.wikidata.wikidata_revision_base import (
 
 _LOGGER = getLogger(__name__)
 
+_T_Id = TypeVar("_T_Id", int, str)
+_T_Chunk = TypeVar("_T_Chunk")
+_T_PydanticModel = TypeVar("_T_PydanticModel", bound=PydanticModel)
+
+
+class _WikidataApiModel(PydanticModel):
+    class Config:
+        allow_mutation = False
+
 
-class _WikidataApiResultRevision(PydanticModel):
+class _WikidataApiResultRevision(_WikidataApiModel):
     revid: int
     parentid: int
     minor: Optional[str]
@@ -42,30 +67,30 @@ class _WikidataApiResultRevision(PydanticModel):
     comment: str
 
 
-class _WikidataApiResultMissingRevisionId(PydanticModel):
+class _WikidataApiResultMissingRevisionId(_WikidataApiModel):
     missing: str
     revid: int
 
 
-class _WikidataApiResultPage(PydanticModel):
+class _WikidataApiResultPage(_WikidataApiModel):
     pageid: int
     ns: int
     title: str
     revisions: Optional[Sequence[_WikidataApiResultRevision]]
 
 
-class _WikidataApiResultMissingPageId(PydanticModel):
+class _WikidataApiResultMissingPageId(_WikidataApiModel):
     missing: str
     pageid: int
 
 
-class _WikidataApiResultMissingEntityId(PydanticModel):
+class _WikidataApiResultMissingEntityId(_WikidataApiModel):
     missing: str
     ns: int
     title: str
 
 
-class _WikidataApiResultPages(PydanticModel):
+class _WikidataApiResultPages(_WikidataApiModel):
     pages: Optional[
         Mapping[
             str,
@@ -79,13 +104,57 @@ class _WikidataApiResultPages(PydanticModel):
     badrevids: Optional[Mapping[int, _WikidataApiResultMissingRevisionId]]
 
 
-class _WikidataApiResult(PydanticModel):
+class _WikidataApiResult(_WikidataApiModel):
     batchcomplete: str
     query: _WikidataApiResultPages
 
+    class Config:
+        json_loads = json_loads
+
+
+class _WikidataApiEntitiesResultEntity(_WikidataApiModel):
+    id: str
+    pageid: int
+    ns: int
+    title: str
+
+
+class _WikidataApiEntitiesResultMissingEntity(_WikidataApiModel):
+    id: str
+    missing: str
+
+
+class _WikidataApiEntitiesResultError(_WikidataApiModel):
+    code: str
+    info: str
+
+
+class _WikidataApiEntitiesResult(_WikidataApiModel):
+    success: Optional[int]
+    entities: Optional[
+        Mapping[
+            str,
+            Union[
+                _WikidataApiEntitiesResultEntity,
+                _WikidataApiEntitiesResultMissingEntity,
+            ],
+        ]
+    ]
+    error: Optional[_WikidataApiEntitiesResultError]
+
+    class Config:
+        json_loads = json_loads
+
 
 class WikidataApi:
+    _WIKIDATA_API_URL = "https://www.wikidata.org/w/api.php"
+    # Maximum number of values per parameter for clients without the apihighlimits
+    # right (i.e., everyone except bots and administrators).
     _WIKIDATA_API_CHUNK_SIZE = 50
+    _WIKIDATA_API_INVALID_ENTITY_ID_CODES = ("no-such-entity", "invalid-entity-id")
+    _WIKIDATA_API_MAX_WORKERS = 16
+    # Older versions of SQLite support at most 999 parameters per query.
+    _WIKIDATA_API_CACHE_CHUNK_SIZE = 500
 
     # TODO: document that these are made against live Wikidata and how that could be
     #  different.
@@ -94,27 +163,26 @@ class WikidataApi:
     #  wikibase_format are hardcoded.
 
     @classmethod
-    def query_page_id(cls, page_id: int) -> Optional[WikidataEntityMetadata]:
-        return next(cls.query_page_ids((page_id,)))
+    def query_page_id(
+        cls, page_id: int, *, cache: Optional[WikidataApiCache] = None
+    ) -> Optional[WikidataEntityMetadata]:
+        return next(cls.query_page_ids((page_id,), cache=cache))
 
     @classmethod
     def query_page_ids(
-        cls, page_ids: Iterable[int]
+        cls, page_ids: Iterable[int], *, cache: Optional[WikidataApiCache] = None
     ) -> Iterator[Optional[WikidataEntityMetadata]]:
-        for page_ids_chunk in chunked(page_ids, cls._WIKIDATA_API_CHUNK_SIZE):
-            response = requests.get(
-                "https://www.wikidata.org/w/api.php?action=query&format=json"
-                "&pageids=" + "|".join(str(p) for p in page_ids_chunk)
-            )
-            response.raise_for_status()
-
-            result = _WikidataApiResult.parse_obj(response.json())
-            if result.batchcomplete != "":
-                _LOGGER.warning(
-                    "Wikidata API returned unknown batchcomplete value: "
-                    f"'{result.batchcomplete}'."
-                )
+        return cls._query_with_cache(
+            page_ids, cache, "page_ids", WikidataEntityMetadata, cls._query_page_ids
+        )
 
+    @classmethod
+    def _query_page_ids(
+        cls, page_ids: Iterable[int]
+    ) -> Iterator[Optional[WikidataEntityMetadata]]:
+        for page_ids_chunk, result in cls._query(
+            chunked(page_ids, cls._WIKIDATA_API_CHUNK_SIZE), cls._build_page_ids_params
+        ):
             pages = result.query.pages or {}
             if len(pages) > len(page_ids_chunk):
                 _LOGGER.warning("Wikidata API returned more pages than expected.")
@@ -132,102 +200,244 @@ class WikidataApi:
                     yield cls._parse_result_page(result_page_)
 
     @classmethod
-    def query_entity_id(cls, entity_id: str) -> Optional[WikidataEntityMetadata]:
-        return next(cls.query_entity_ids((entity_id,)))
+    def query_entity_id(
+        cls, entity_id: str, *, cache: Optional[WikidataApiCache] = None
+    ) -> Optional[WikidataEntityMetadata]:
+        return next(cls.query_entity_ids((entity_id,), cache=cache))
 
     @classmethod
     def query_entity_ids(
-        cls, entity_ids: Iterable[str]
+        cls, entity_ids: Iterable[str], *, cache: Optional[WikidataApiCache] = None
     ) -> Iterator[Optional[WikidataEntityMetadata]]:
-        for entity_ids_chunk in chunked(entity_ids, cls._WIKIDATA_API_CHUNK_SIZE):
-            response = requests.get(
-                "https://www.wikidata.org/w/api.php?action=query&format=json"
-                "&titles=" + "|".join(str(e) for e in entity_ids_chunk)
-            )
-            response.raise_for_status()
+        return cls._query_with_cache(
+            entity_ids,
+            cache,
+            "entity_ids",
+            WikidataEntityMetadata,
+            cls._query_entity_ids,
+        )
 
-            result = _WikidataApiResult.parse_obj(response.json())
-            if result.batchcomplete != "":
+    @classmethod
+    def _query_entity_ids(
+        cls, entity_ids: Iterable[str], chunk_size: int = _WIKIDATA_API_CHUNK_SIZE
+    ) -> Iterator[Optional[WikidataEntityMetadata]]:
+        for entity_ids_chunk, response in cls._request(
+            chunked(entity_ids, chunk_size), cls._build_entity_ids_params
+        ):
+            result = _WikidataApiEntitiesResult.parse_raw(response)
+            if result.error is not None:
+                if result.error.code not in cls._WIKIDATA_API_INVALID_ENTITY_ID_CODES:
+                    raise Exception(
+                        f"Wikidata API returned error: {result.error.code} "
+                        f"({result.error.info})."
+                    )
+
+                # wbgetentities fails the whole request if any of the given entity IDs
+                # is invalid (e.g., malformed). Query them one by one instead so that
+                # only the offending entity IDs are reported as missing.
+                if len(entity_ids_chunk) > 1:
+                    yield from cls._query_entity_ids(entity_ids_chunk, chunk_size=1)
+                    continue
                 _LOGGER.warning(
-                    "Wikidata API returned unknown batchcomplete value: "
-                    f"'{result.batchcomplete}'."
+                    f"Wikidata API returned error for entity ID {entity_ids_chunk[0]}: "
+                    f"{result.error.code} ({result.error.info})."
                 )
+                yield None
+                continue
 
-            entity_ids_to_result_page = {}
-            for result_page in (result.query.pages or {}).values():
-                if not isinstance(result_page, _WikidataApiResultPage):
-                    continue
-                entity_ids_to_result_page[result_page.title] = result_page
+            yield from cls._parse_entities_result(entity_ids_chunk, result)
 
-            if len(entity_ids_to_result_page) > len(entity_ids_chunk):
-                _LOGGER.warning("Wikidata API returned more pages than expected.")
+    @classmethod
+    def _parse_entities_result(
+        cls, entity_ids_chunk: Sequence[str], result: _WikidataApiEntitiesResult
+    ) -> Iterator[Optional[WikidataEntityMetadata]]:
+        if result.success != 1:
+            _LOGGER.warning(
+                f"Wikidata API returned unknown success value: '{result.success}'."
+            )
 
-            for entity_id in entity_ids_chunk:
-                result_page_ = entity_ids_to_result_page.get(entity_id)
-                if not result_page_:
-                    _LOGGER.warning(
-                        f"Wikidata API did not return result for entity ID {entity_id}."
-                    )
-                    yield None
-                else:
-                    yield cls._parse_result_page(result_page_)
+        entities = result.entities or {}
+        if len(entities) > len(entity_ids_chunk):
+            _LOGGER.warning("Wikidata API returned more entities than expected.")
+
+        for entity_id in entity_ids_chunk:
+            result_entity = entities.get(entity_id)
+            if (
+                not result_entity
+                or not isinstance(result_entity, _WikidataApiEntitiesResultEntity)
+                or result_entity.id != entity_id
+            ):
+                _LOGGER.warning(
+                    f"Wikidata API did not return result for entity ID {entity_id}."
+                )
+                yield None
+            else:
+                yield cls._parse_result_entity(result_entity)
 
     @classmethod
-    def query_revision_id(cls, revision_id: int) -> Optional[WikidataRevisionBase]:
-        return next(cls.query_revision_ids((revision_id,)))
+    def query_revision_id(
+        cls, revision_id: int, *, cache: Optional[WikidataApiCache] = None
+    ) -> Optional[WikidataRevisionBase]:
+        return next(cls.query_revision_ids((revision_id,), cache=cache))
 
     @classmethod
     def query_revision_ids(
-        cls, revision_ids: Iterable[int]
+        cls, revision_ids: Iterable[int], *, cache: Optional[WikidataApiCache] = None
     ) -> Iterator[Optional[WikidataRevisionBase]]:
-        for revision_ids_chunk in chunked(revision_ids, cls._WIKIDATA_API_CHUNK_SIZE):
-            response = requests.get(
-                "https://www.wikidata.org/w/api.php?action=query&format=json"
-                "&prop=revisions&rvprop=ids|flags|timestamp|user|userid|sha1|comment"
-                "&revids=" + "|".join(str(r) for r in revision_ids_chunk)
-            )
-            response.raise_for_status()
-
-            result = _WikidataApiResult.parse_obj(response.json())
-            if result.batchcomplete != "":
-                _LOGGER.warning(
-                    "Wikidata API returned unknown batchcomplete value: "
-                    f"'{result.batchcomplete}'."
-                )
+        return cls._query_with_cache(
+            revision_ids,
+            cache,
+            "revision_ids",
+            WikidataRevisionBase,
+            cls._query_revision_ids,
+        )
 
-            revision_ids_to_indices = {}
-            pages = list((result.query.pages or {}).values())
-            for index_page, result_page in enumerate(pages):
+    @classmethod
+    def _query_revision_ids(
+        cls, revision_ids: Iterable[int]
+    ) -> Iterator[Optional[WikidataRevisionBase]]:
+        for revision_ids_chunk, result in cls._query(
+            chunked(revision_ids, cls._WIKIDATA_API_CHUNK_SIZE),
+            cls._build_revision_ids_params,
+        ):
+            revisions = {}
+            for result_page in (result.query.pages or {}).values():
                 if not isinstance(result_page, _WikidataApiResultPage):
                     continue
-                assert result_page.revisions is not None
-                for index_revision, result_revision in enumerate(result_page.revisions):
-                    assert result_revision.revid not in revision_ids_to_indices
-                    revision_ids_to_indices[result_revision.revid] = (
-                        index_page,
-                        index_revision,
-                    )
+                for result_revision in result_page.revisions or ():
+                    revisions[result_revision.revid] = (result_page, result_revision)
 
-            if len(revision_ids_to_indices) > len(revision_ids_chunk):
+            if len(revisions) > len(revision_ids_chunk):
                 _LOGGER.warning("Wikidata API returned more revisions than expected.")
 
             for revision_id in revision_ids_chunk:
-                indices = revision_ids_to_indices.get(revision_id)
-                if not indices:
+                result_page_and_revision = revisions.get(revision_id)
+                if not result_page_and_revision:
                     _LOGGER.warning(
                         "Wikidata API did not return result for revision ID "
                         f"{revision_id}."
                     )
                     yield None
                 else:
-                    index_page, index_revision = indices
-                    result_page = pages[index_page]
-                    assert isinstance(result_page, _WikidataApiResultPage)
-                    assert result_page.revisions is not None
-                    result_revision = result_page.revisions[index_revision]
-                    yield cls._parse_result_page_and_revision(
-                        result_page, result_revision
-                    )
+                    yield cls._parse_result_page_and_revision(*result_page_and_revision)
+
+    @classmethod
+    def _query_with_cache(
+        cls,
+        ids: Iterable[_T_Id],
+        cache: Optional[WikidataApiCache],
+        endpoint: str,
+        result_type: Type[_T_PydanticModel],
+        query_func: Callable[[Iterable[_T_Id]], Iterator[Optional[_T_PydanticModel]]],
+    ) -> Iterator[Optional[_T_PydanticModel]]:
+        if cache is None:
+            yield from query_func(ids)
+            return
+
+        for ids_chunk in chunked(ids, cls._WIKIDATA_API_CACHE_CHUNK_SIZE):
+            keys = list(map(str, ids_chunk))
+            cached_results = cache.get_many(endpoint, keys, result_type)
+            missing = [
+                (key, id_)
+                for key, id_ in zip(keys, ids_chunk)
+                if key not in cached_results
+            ]
+            queried_results = {
+                key: result
+                for (key, _), result in zip(
+                    missing, query_func([id_ for _, id_ in missing])
+                )
+                if result is not None
+            }
+            cache.put_many(endpoint, queried_results)
+
+            for key in keys:
+                yield cached_results.get(key) or queried_results.get(key)
+
+    @classmethod
+    def _build_page_ids_params(cls, page_ids_chunk: Sequence[int]) -> Mapping[str, str]:
+        return {
+            "action": "query",
+            "format": "json",
+            "pageids": "|".join(map(str, page_ids_chunk)),
+        }
+
+    @classmethod
+    def _build_entity_ids_params(
+        cls, entity_ids_chunk: Sequence[str]
+    ) -> Mapping[str, str]:
+        # Uses wbgetentities instead of querying by page title, as it is meant for
+        # looking up batches of entity IDs and returns a much smaller response.
+        # Redirects are not resolved, so that redirected entity IDs are reported as
+        # missing instead of returning the metadata of their targets.
+        return {
+            "action": "wbgetentities",
+            "format": "json",
+            "props": "info",
+            "redirects": "no",
+            "ids": "|".join(entity_ids_chunk),
+        }
+
+    @classmethod
+    def _build_revision_ids_params(
+        cls, revision_ids_chunk: Sequence[int]
+    ) -> Mapping[str, str]:
+        return {
+            "action": "query",
+            "format": "json",
+            "prop": "revisions",
+            "rvprop": "ids|flags|timestamp|user|userid|sha1|comment",
+            "revids": "|".join(map(str, revision_ids_chunk)),
+        }
+
+    @classmethod
+    def _query(
+        cls,
+        chunks: Iterable[_T_Chunk],
+        build_params: Callable[[_T_Chunk], Mapping[str, str]],
+    ) -> Iterator[Tuple[_T_Chunk, _WikidataApiResult]]:
+        for chunk, response in cls._request(chunks, build_params):
+            result = _WikidataApiResult.parse_raw(response)
+            if result.batchcomplete != "":
+                _LOGGER.warning(
+                    "Wikidata API returned unknown batchcomplete value: "
+                    f"'{result.batchcomplete}'."
+                )
+            yield chunk, result
+
+    @classmethod
+    def _request(
+        cls,
+        chunks: Iterable[_T_Chunk],
+        build_params: Callable[[_T_Chunk], Mapping[str, str]],
+    ) -> Iterator[Tuple[_T_Chunk, bytes]]:
+        # Parameters are sent as POST data so that request size is not limited by the
+        # maximum URL length. Requests are dispatched concurrently, but responses are
+        # yielded in the order of the given chunks. Only as many requests as there are
+        # workers are in flight at a time (refilled as responses are consumed), so that
+        # neither all chunks nor all responses have to be kept in memory.
+        def post(chunk: _T_Chunk) -> requests.Response:
+            return http_session.post(cls._WIKIDATA_API_URL, data=build_params(chunk))
+
+        chunks_iter = iter(chunks)
+        with ThreadPoolExecutor(max_workers=cls._WIKIDATA_API_MAX_WORKERS) as executor:
+            futures: Deque[Tuple[_T_Chunk, "Future[requests.Response]"]] = deque(
+                (chunk, executor.submit(post, chunk))
+                for chunk in islice(chunks_iter, cls._WIKIDATA_API_MAX_WORKERS)
+            )
+            try:
+                while futures:
+                    chunk, future = futures.popleft()
+                    response = future.result()
+                    for next_chunk in islice(chunks_iter, 1):
+                        futures.append((next_chunk, executor.submit(post, next_chunk)))
+                    response.raise_for_status()
+                    yield chunk, response.content
+            finally:
+                # If the consumer stops early, do not wait for requests that have not
+                # been started yet when shutting down the executor.
+                for _, future in futures:
+                    future.cancel()
 
     @classmethod
     def _parse_result_page(
@@ -240,6 +450,17 @@ class WikidataApi:
             redirect=None,
         )
 
+    @classmethod
+    def _parse_result_entity(
+        cls, result_entity: _WikidataApiEntitiesResultEntity
+    ) -> WikidataEntityMetadata:
+        return WikidataEntityMetadata(
+            entity_id=result_entity.id,
+            page_id=result_entity.pageid,
+            namespace=result_entity.ns,
+            redirect=None,
+        )
+
     @classmethod
     def _parse_result_page_and_revision(
         cls,
@@ -256,8 +477,10 @@ class WikidataApi:
             parent_revision_id=(
                 result_revision.parentid if result_revision.parentid != 0 else None
             ),
-            timestamp=datetime.strptime(
-                result_revision.timestamp, "%Y-%m-%dT%H:%M:%S%z"
+            # Much faster than datetime.strptime(), but only supports the "Z" suffix
+            # from Python 3.11 onwards.
+            timestamp=datetime.fromisoformat(
+                result_revision.timestamp.replace("Z", "+00:00")
             ),
             contributor=result_revision.user,
             contributor_id=result_revision.userid,
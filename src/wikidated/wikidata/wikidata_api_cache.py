@@ -0,0 +1,102 @@
+#
+# Copyright 2021-2022 Lukas Schmelzeisen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import timedelta
+from logging import getLogger
+from pathlib import Path
+from time import time
+from types import TracebackType
+from typing import Mapping, MutableSequence, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel as PydanticModel
+from typing_extensions import Final
+
+_LOGGER = getLogger(__name__)
+
+_T_PydanticModel = TypeVar("_T_PydanticModel", bound=PydanticModel)
+
+
+class WikidataApiCache:
+    # Revisions are immutable, so cached results for revision IDs never expire. The
+    # metadata of pages and entities on the other hand may change over time, which is
+    # why results for these expire after the given time-to-live (if any).
+    IMMUTABLE_ENDPOINTS: Final = frozenset({"revision_ids"})
+
+    def __init__(self, path: Path, *, ttl: Optional[timedelta] = None) -> None:
+        self.path: Final = path
+        self.ttl: Final = ttl
+
+        _LOGGER.debug(f"Opening Wikidata API cache '{self.path}'.")
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._connection = sqlite3.connect(str(self.path), isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "endpoint TEXT, id TEXT, body BLOB, created REAL, "
+            "PRIMARY KEY (endpoint, id))"
+        )
+
+    def close(self) -> None:
+        _LOGGER.debug(f"Closing Wikidata API cache '{self.path}'.")
+        self._connection.close()
+
+    def __enter__(self) -> WikidataApiCache:
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: Optional[Type[BaseException]],
+        _exc_val: Optional[BaseException],
+        _exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def get_many(
+        self, endpoint: str, ids: Sequence[str], result_type: Type[_T_PydanticModel]
+    ) -> Mapping[str, _T_PydanticModel]:
+        if not ids:
+            return {}
+
+        query = (
+            "SELECT id, body FROM cache WHERE endpoint = ? "
+            f"AND id IN ({', '.join('?' * len(ids))})"  # noqa: S608
+        )
+        parameters: MutableSequence[object] = [endpoint, *ids]
+        if self.ttl is not None and endpoint not in self.IMMUTABLE_ENDPOINTS:
+            query += " AND created >= ?"
+            parameters.append(time() - self.ttl.total_seconds())
+
+        return {
+            id_: result_type.parse_raw(body)
+            for id_, body in self._connection.execute(query, parameters)
+        }
+
+    def put_many(self, endpoint: str, results: Mapping[str, PydanticModel]) -> None:
+        if not results:
+            return
+
+        created = time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO cache (endpoint, id, body, created) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (endpoint, id_, result.json().encode("UTF-8"), created)
+                for id_, result in results.items()
+            ),
+        )
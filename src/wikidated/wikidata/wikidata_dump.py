@@ -16,19 +16,19 @@
 
 from __future__ import annotations
 
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timezone
+from functools import lru_cache
 from logging import getLogger
 from pathlib import Path
-from typing import Mapping, MutableSequence, Sequence, Type, TypeVar
+from typing import Mapping, MutableSequence, Optional, Sequence, Type, TypeVar
 
-import requests
 from pydantic import BaseModel as PydanticModel
 from pydantic import validator
 from tqdm import tqdm  # type: ignore
 from typing_extensions import Final
 
-from wikidated._utils import RangeMap
+from wikidated._utils import RangeMap, http_session, json_loads
 from wikidated.wikidata.wikidata_dump_file import WikidataDumpFile
 from wikidated.wikidata.wikidata_dump_pages_meta_history import (
     WikidataDumpPagesMetaHistory,
@@ -46,6 +46,10 @@ _T_WikidataDumpFile = TypeVar("_T_WikidataDumpFile", bound=WikidataDumpFile)
 
 
 class WikidataDump:
+    # dumps.wikimedia.org only allows two concurrent connections per IP address, which
+    # are shared between downloading multiple files and multiple parts of each file.
+    _MAX_CONNECTIONS = 2
+
     def __init__(
         self,
         dump_dir: Path,
@@ -61,18 +65,45 @@ class WikidataDump:
             self._dump_dir, self.version, self.mirror
         )
 
-        self.sites_table: Final = self._construct_dumps(
-            WikidataDumpSitesTable, "sitestable"
-        )[0]
-        self.pages_meta_history: Final = RangeMap[WikidataDumpPagesMetaHistory]()
-        for dump_file in self._construct_dumps(
-            WikidataDumpPagesMetaHistory, "metahistory7zdump"
-        ):
-            self.pages_meta_history[dump_file.page_ids] = dump_file
+        # Dump files are only constructed on first access and then reused.
+        self._sites_table: Optional[WikidataDumpSitesTable] = None
+        self._pages_meta_history: Optional[
+            RangeMap[WikidataDumpPagesMetaHistory]
+        ] = None
+
+    @property
+    def sites_table(self) -> WikidataDumpSitesTable:
+        if self._sites_table is None:
+            self._sites_table = self._construct_dumps(
+                WikidataDumpSitesTable, "sitestable"
+            )[0]
+        return self._sites_table
+
+    @property
+    def pages_meta_history(self) -> RangeMap[WikidataDumpPagesMetaHistory]:
+        if self._pages_meta_history is None:
+            self._pages_meta_history = RangeMap[WikidataDumpPagesMetaHistory]()
+            for dump_file in self._construct_dumps(
+                WikidataDumpPagesMetaHistory, "metahistory7zdump"
+            ):
+                self._pages_meta_history[dump_file.page_ids] = dump_file
+        return self._pages_meta_history
 
     def download(
-        self, *, sites_table: bool = True, pages_meta_history: bool = True
+        self,
+        *,
+        sites_table: bool = True,
+        pages_meta_history: bool = True,
+        max_workers: int = 2,
     ) -> None:
+        """Download the selected dump files, skipping those that already exist.
+
+        At most two connections are opened (the limit of dumps.wikimedia.org), shared
+        between files and parts of files. With the default of two workers, two files
+        are downloaded at a time over a single connection each. Only with
+        ``max_workers=1`` are large files downloaded in two parts via range requests.
+        """
+        max_workers = min(max_workers, self._MAX_CONNECTIONS)
         _LOGGER.info(
             f"Downloading Wikidata dump {self.version:%4Y%2m%2d} from '{self.mirror}'."
         )
@@ -97,11 +128,29 @@ class WikidataDump:
             unit="B",
             unit_scale=True,
             unit_divisor=1024,
-        ) as progress_bar_size:
-            for dump_file in dump_files:
-                dump_file.download()
-                progress_bar_files.update(1)
-                progress_bar_size.update(dump_file.size)
+        ) as progress_bar_size, ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            # Progress bars of individual files would overlap each other when
+            # downloading multiple files at once.
+            futures = {
+                executor.submit(
+                    dump_file.download,
+                    num_parts=max(1, self._MAX_CONNECTIONS // max_workers),
+                    display_progress_bar=(max_workers == 1),
+                ): dump_file
+                for dump_file in dump_files
+            }
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    progress_bar_files.update(1)
+                    progress_bar_size.update(futures[future].size)
+            finally:
+                # If a download fails, do not wait for all remaining files to be
+                # downloaded when shutting down the executor.
+                for future in futures:
+                    future.cancel()
 
         _LOGGER.info(f"Done downloading Wikidata dump {self.version:%4Y%2m%2d}.")
 
@@ -135,32 +184,43 @@ class _WikidataDumpStatusJob(PydanticModel):
 
     @validator("updated", pre=True)
     def _parse_datetime(cls, value: str) -> datetime:  # noqa: N805
-        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        return datetime.fromisoformat(value)  # Format: "%Y-%m-%d %H:%M:%S".
 
 
 class _WikidataDumpStatus(PydanticModel):
     jobs: Mapping[str, _WikidataDumpStatusJob]
     version: str
 
+    class Config:
+        json_loads = json_loads
+
     @classmethod
     def load(cls, dump_dir: Path, version: date, mirror: str) -> _WikidataDumpStatus:
-        path = dump_dir / f"wikidatawiki-{version:%4Y%2m%2d}-dumpstatus.json"
-        if not path.exists():
-            url = f"{mirror}/wikidatawiki/{version:%4Y%2m%2d}/dumpstatus.json"
-            _LOGGER.debug(f"Downloading Wikidata dump status from '{url}'.")
-
-            response = requests.get(url)
-            response.raise_for_status()
-            path.parent.mkdir(exist_ok=True, parents=True)
-            with path.open("w", encoding="UTF-8") as fd:
-                fd.write(json.dumps(response.json(), indent=2) + "\n")
-
-            _LOGGER.debug("Done downloading Wikidata dump status.")
-
-        dump_status = _WikidataDumpStatus.parse_file(path)
-        for job_name, job in dump_status.jobs.items():
-            if job.status != "done":
-                path.unlink()
-                raise Exception(f"Job '{job_name}' is not 'done', but '{job.status}'.")
-
-        return dump_status
+        return _load_dump_status(dump_dir, version, mirror)
+
+
+# Dump status files of finished dumps never change, so each one only needs to be
+# parsed once per process, no matter how many WikidataDump instances are created.
+@lru_cache(maxsize=None)
+def _load_dump_status(
+    dump_dir: Path, version: date, mirror: str
+) -> _WikidataDumpStatus:
+    path = dump_dir / f"wikidatawiki-{version:%4Y%2m%2d}-dumpstatus.json"
+    if not path.exists():
+        url = f"{mirror}/wikidatawiki/{version:%4Y%2m%2d}/dumpstatus.json"
+        _LOGGER.debug(f"Downloading Wikidata dump status from '{url}'.")
+
+        response = http_session.get(url)
+        response.raise_for_status()
+        path.parent.mkdir(exist_ok=True, parents=True)
+        path.write_bytes(response.content)
+
+        _LOGGER.debug("Done downloading Wikidata dump status.")
+
+    dump_status = _WikidataDumpStatus.parse_raw(path.read_bytes())
+    for job_name, job in dump_status.jobs.items():
+        if job.status != "done":
+            path.unlink()
+            raise Exception(f"Job '{job_name}' is not 'done', but '{job.status}'.")
+
+    return dump_status
@@ -20,19 +20,30 @@ from pathlib import Path
 
 from typing_extensions import Final
 
-from wikidated._utils import download_file_with_progressbar, hashcheck
+from wikidated._utils import (
+    download_file_in_parts_with_progressbar,
+    download_file_with_progressbar,
+    hashcheck,
+    hashcompare,
+)
 
 _LOGGER = getLogger(__name__)
 
 
 class WikidataDumpFile:
+    # Files larger than this (e.g., the pages-meta-history 7z files) are downloaded in
+    # multiple parts in parallel.
+    _PARALLEL_DOWNLOAD_MIN_SIZE = 1024 * 1024 * 1024  # 1 GiB
+
     def __init__(self, *, path: Path, url: str, sha1: str, size: int) -> None:
         self.path: Final = path
         self.url: Final = url
         self.sha1: Final = sha1
         self.size: Final = size
 
-    def download(self) -> None:
+    def download(
+        self, *, num_parts: int = 2, display_progress_bar: bool = True
+    ) -> None:
         if self.path.exists():
             hashcheck(self.path, calc_sha1(), self.sha1)
             _LOGGER.debug(
@@ -46,7 +57,24 @@ class WikidataDumpFile:
         )
         self.path.parent.mkdir(exist_ok=True, parents=True)
         path_tmp = self.path.parent / ("tmp." + self.path.name)
-        download_file_with_progressbar(self.url, path_tmp, description=self.path.name)
-        hashcheck(path_tmp, calc_sha1(), self.sha1)
+        if num_parts > 1 and self.size >= self._PARALLEL_DOWNLOAD_MIN_SIZE:
+            download_file_in_parts_with_progressbar(
+                self.url,
+                path_tmp,
+                num_parts=num_parts,
+                description=self.path.name,
+                display_progress_bar=display_progress_bar,
+            )
+            hashcheck(path_tmp, calc_sha1(), self.sha1)
+        else:
+            h = calc_sha1()
+            download_file_with_progressbar(
+                self.url,
+                path_tmp,
+                description=self.path.name,
+                h=h,
+                display_progress_bar=display_progress_bar,
+            )
+            hashcompare(path_tmp, h, self.sha1)
         path_tmp.rename(self.path)
         _LOGGER.debug(f"Done downloading Wikidata dump file '{self.path.name}'.")
@@ -15,25 +15,85 @@
 #
 
 import re
-from datetime import date, datetime
-from itertools import chain
+from datetime import date, datetime, timezone
 from logging import getLogger
 from pathlib import Path
-from typing import Iterator, Mapping, MutableMapping, Optional, Tuple
-from xml.sax.saxutils import unescape
+from sys import intern
+from typing import Iterable, Iterator, Mapping, MutableMapping, Optional, Sequence
 
 from pydantic import BaseModel as PydanticModel
 from tqdm import tqdm  # type: ignore
+from typing_extensions import Final
 
-from wikidated._utils import SevenZipArchive
+from wikidated._utils import SevenZipArchive, chunked
 from wikidated.wikidata.wikidata_dump_file import WikidataDumpFile
-from wikidated.wikidata.wikidata_revision_base import (
-    WikidataRevisionBase,
-    WikidataRevisionMetadata,
-)
+from wikidated.wikidata.wikidata_revision_base import WikidataRevisionBase
 
 _LOGGER = getLogger(__name__)
 
+# Tag checks below are performed for nearly every line of the dump, so they avoid
+# creating stripped copies of the (potentially very long) lines.
+_OPENING_TAG_PATTERNS: Final = {
+    element: re.compile(rf"\s*<{element}")
+    for element in (
+        "mediawiki",
+        "siteinfo",
+        "sitename",
+        "dbname",
+        "base",
+        "generator",
+        "case",
+        "namespaces",
+        "namespace",
+        "page",
+        "title",
+        "ns",
+        "id",
+        "redirect",
+        "revision",
+        "parentid",
+        "timestamp",
+        "contributor",
+        "ip",
+        "username",
+        "minor",
+        "comment",
+        "model",
+        "format",
+        "text",
+        "sha1",
+    )
+}
+_CLOSING_TAGS: Final = {
+    element: (f"</{element}>\n", f"</{element}>")
+    for element in (
+        "mediawiki",
+        "siteinfo",
+        "sitename",
+        "dbname",
+        "base",
+        "generator",
+        "case",
+        "namespaces",
+        "namespace",
+        "page",
+        "title",
+        "ns",
+        "id",
+        "revision",
+        "parentid",
+        "timestamp",
+        "contributor",
+        "ip",
+        "username",
+        "comment",
+        "model",
+        "format",
+        "text",
+        "sha1",
+    )
+}
+
 
 class WikidataSiteInfo(PydanticModel):
     site_name: str
@@ -55,14 +115,15 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
     # elements occurring within each other. As such the code will need to be manually
     # updated to change in the dump format but on the other hand is much faster.
 
+    _FILE_NAME_PATTERN = re.compile(
+        r"^wikidatawiki-(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})-pages-meta-"
+        r"history\d+\.xml-p(?P<min_page_id>\d+)p(?P<max_page_id>\d+)\.7z$"
+    )
+
     def __init__(self, *, path: Path, url: str, sha1: str, size: int) -> None:
         super().__init__(path=path, url=url, sha1=sha1, size=size)
 
-        match = re.match(
-            r"^wikidatawiki-(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})-pages-meta-"
-            r"history\d+.xml-p(?P<min_page_id>\d+)p(?P<max_page_id>\d+).7z$",
-            self.path.name,
-        )
+        match = self._FILE_NAME_PATTERN.match(self.path.name)
         if not match:
             raise Exception(
                 f"File '{self.path.name}' is not a Wikidata dump pages-meta-history "
@@ -105,7 +166,7 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
             cls._assert_opening_tag(line, "namespace")
             key_index = line.index('key="') + len('key="')
             namespace_key = int(line[key_index : line.index('"', key_index)])
-            if line.rstrip().endswith("/>"):  # <namespace key="0" />
+            if cls._is_self_closing_tag(line):  # <namespace key="0" />
                 namespaces[namespace_key] = ""
             else:
                 namespaces[namespace_key] = cls._extract_value(line, "namespace")
@@ -124,7 +185,7 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
         return self.iter_revisions()
 
     def iter_revisions(
-        self, *, display_progress_bar: bool = True
+        self, *, include_text: bool = True, display_progress_bar: bool = True
     ) -> Iterator[WikidataRawRevision]:
         assert self.path.exists()
 
@@ -152,7 +213,9 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
             for line in lines:
                 if self._is_closing_tag(line, "mediawiki"):
                     break
-                for revision in self._process_page(chain((line,), lines)):
+                for revision in self._process_page(
+                    line, lines, include_text=include_text
+                ):
                     yield revision
                     num_revisions += 1
                 num_pages += 1
@@ -174,9 +237,29 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
             f"Found {num_pages:,} pages and {num_revisions:,} revisions."
         )
 
+    def iter_revision_batches(
+        self,
+        batch_size: int = 1024,
+        *,
+        include_text: bool = True,
+        display_progress_bar: bool = True,
+    ) -> Iterable[Sequence[WikidataRawRevision]]:
+        return chunked(
+            self.iter_revisions(
+                include_text=include_text, display_progress_bar=display_progress_bar
+            ),
+            batch_size,
+        )
+
+    # Instead of pushing already read lines back into the iterator, the first line of
+    # an element is passed along explicitly, and after optional elements we only advance
+    # to the next line if the element was actually present.
+
     @classmethod
-    def _process_page(cls, lines: Iterator[str]) -> Iterator[WikidataRawRevision]:
-        cls._assert_opening_tag(next(lines), "page")
+    def _process_page(
+        cls, line: str, lines: Iterator[str], *, include_text: bool
+    ) -> Iterator[WikidataRawRevision]:
+        cls._assert_opening_tag(line, "page")
         entity_id = cls._unescape_xml(cls._extract_value(next(lines), "title"))
         namespace = int(cls._extract_value(next(lines), "ns"))
         page_id = int(cls._extract_value(next(lines), "id"))
@@ -186,48 +269,42 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
         if cls._is_opening_tag(line, "redirect"):
             title_index = line.index('title="') + len('title="')
             redirect = line[title_index : line.index('"', title_index)]
-        else:
-            lines = chain((line,), lines)
+            line = next(lines)
 
-        for line in lines:
-            if cls._is_closing_tag(line, "page"):
-                break
-            revision_metadata, text = cls._process_revision(chain((line,), lines))
-            yield WikidataRawRevision(
+        while not cls._is_closing_tag(line, "page"):
+            yield cls._process_revision(
+                line,
+                lines,
                 entity_id=entity_id,
                 page_id=page_id,
                 namespace=namespace,
                 redirect=redirect,
-                revision_id=revision_metadata.revision_id,
-                parent_revision_id=revision_metadata.parent_revision_id,
-                timestamp=revision_metadata.timestamp,
-                contributor=revision_metadata.contributor,
-                contributor_id=revision_metadata.contributor_id,
-                is_minor=revision_metadata.is_minor,
-                comment=revision_metadata.comment,
-                wikibase_model=revision_metadata.wikibase_model,
-                wikibase_format=revision_metadata.wikibase_format,
-                sha1=revision_metadata.sha1,
-                text=text,
+                include_text=include_text,
             )
+            line = next(lines)
 
     @classmethod
     def _process_revision(
-        cls, lines: Iterator[str]
-    ) -> Tuple[WikidataRevisionMetadata, Optional[str]]:
-        cls._assert_opening_tag(next(lines), "revision")
+        cls,
+        line: str,
+        lines: Iterator[str],
+        *,
+        entity_id: str,
+        page_id: int,
+        namespace: int,
+        redirect: Optional[str],
+        include_text: bool,
+    ) -> WikidataRawRevision:
+        cls._assert_opening_tag(line, "revision")
         revision_id = int(cls._extract_value(next(lines), "id"))
 
         parent_revision_id: Optional[int] = None
         line = next(lines)
         if cls._is_opening_tag(line, "parentid"):
             parent_revision_id = int(cls._extract_value(line, "parentid"))
-        else:
-            lines = chain((line,), lines)
+            line = next(lines)
 
-        timestamp = datetime.strptime(
-            cls._extract_value(next(lines), "timestamp"), "%Y-%m-%dT%H:%M:%S%z"
-        )
+        timestamp = cls._parse_timestamp(cls._extract_value(line, "timestamp"))
 
         contributor: Optional[str] = None
         contributor_id: Optional[int] = None
@@ -238,7 +315,7 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
             if cls._is_opening_tag(line, "ip"):
                 contributor = cls._extract_value(line, "ip")
             else:
-                contributor = cls._extract_value(line, "username")
+                contributor = intern(cls._extract_value(line, "username"))
                 contributor_id = int(cls._extract_value(next(lines), "id"))
             cls._assert_closing_tag(next(lines), "contributor")
 
@@ -246,53 +323,88 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
         line = next(lines)
         if cls._is_opening_tag(line, "minor"):
             is_minor = True
-        else:
-            lines = chain((line,), lines)
+            line = next(lines)
 
         comment: Optional[str] = None
-        line = next(lines)
         if cls._is_opening_tag(line, "comment"):
             if 'deleted="deleted"' not in line:
-                comment = cls._extract_value_multiline(chain((line,), lines), "comment")
+                comment = cls._extract_value_multiline(line, lines, "comment")
                 if comment:
                     comment = cls._unescape_xml(comment)
-        else:
-            lines = chain((line,), lines)
+            line = next(lines)
 
-        wikibase_model = cls._extract_value(next(lines), "model")
-        wikibase_format = cls._extract_value(next(lines), "format")
+        # Few distinct values repeat for huge numbers of revisions, so share one object
+        # per value (the same is done for usernames above).
+        wikibase_model = intern(cls._extract_value(line, "model"))
+        wikibase_format = intern(cls._extract_value(next(lines), "format"))
 
-        text = cls._extract_value_multiline(lines, "text")
-        if text:
-            text = cls._unescape_xml(text)
+        text = cls._process_text(next(lines), lines, include_text=include_text)
 
         sha1 = None
         line = next(lines)
         cls._assert_opening_tag(line, "sha1")
-        if not line.rstrip().endswith("/>"):
+        if not cls._is_self_closing_tag(line):
             sha1 = cls._extract_value(line, "sha1")
 
         cls._assert_closing_tag(next(lines), "revision")
 
-        return (
-            WikidataRevisionMetadata(
-                revision_id=revision_id,
-                parent_revision_id=parent_revision_id,
-                timestamp=timestamp,
-                contributor=contributor,
-                contributor_id=contributor_id,
-                is_minor=is_minor,
-                comment=comment,
-                wikibase_model=wikibase_model,
-                wikibase_format=wikibase_format,
-                sha1=sha1,
-            ),
-            text,
+        # All values are parsed into their correct types above, so skip pydantic's
+        # validation which would otherwise dominate parsing time for each revision.
+        return WikidataRawRevision.construct(
+            entity_id=entity_id,
+            page_id=page_id,
+            namespace=namespace,
+            redirect=redirect,
+            revision_id=revision_id,
+            parent_revision_id=parent_revision_id,
+            timestamp=timestamp,
+            contributor=contributor,
+            contributor_id=contributor_id,
+            is_minor=is_minor,
+            comment=comment,
+            wikibase_model=wikibase_model,
+            wikibase_format=wikibase_format,
+            sha1=sha1,
+            text=text,
         )
 
+    @classmethod
+    def _process_text(
+        cls, line: str, lines: Iterator[str], *, include_text: bool
+    ) -> Optional[str]:
+        # Texts make up the bulk of the dump, so if they are not needed, only skip over
+        # them without assembling and unescaping their values.
+        if not include_text:
+            cls._skip_value_multiline(line, lines, "text")
+            return None
+
+        text = cls._extract_value_multiline(line, lines, "text")
+        if text:
+            text = cls._unescape_xml(text)
+        return text
+
+    @classmethod
+    def _parse_timestamp(cls, value: str) -> datetime:
+        # Timestamps in the dump are always in UTC, e.g., "2012-10-29T17:03:21Z".
+        # Slicing out the fields directly is much faster than datetime.strptime().
+        if len(value) == 20 and value[19] == "Z":
+            try:
+                return datetime(
+                    int(value[0:4]),
+                    int(value[5:7]),
+                    int(value[8:10]),
+                    int(value[11:13]),
+                    int(value[14:16]),
+                    int(value[17:19]),
+                    tzinfo=timezone.utc,
+                )
+            except ValueError:
+                pass
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
     @classmethod
     def _is_opening_tag(cls, line: str, element: str) -> bool:
-        return line.lstrip().startswith("<" + element)
+        return _OPENING_TAG_PATTERNS[element].match(line) is not None
 
     @classmethod
     def _assert_opening_tag(cls, line: str, element: str) -> None:
@@ -301,7 +413,11 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
 
     @classmethod
     def _is_closing_tag(cls, line: str, element: str) -> bool:
-        return line.rstrip().endswith("</" + element + ">")
+        return line.endswith(_CLOSING_TAGS[element])
+
+    @classmethod
+    def _is_self_closing_tag(cls, line: str) -> bool:
+        return line.endswith(("/>\n", "/>"))
 
     @classmethod
     def _assert_closing_tag(cls, line: str, element: str) -> None:
@@ -310,22 +426,27 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
 
     @classmethod
     def _extract_value(cls, line: str, element: str) -> str:
-        cls._assert_opening_tag(line, element)
-        cls._assert_closing_tag(line, element)
-        return line[line.index(">") + 1 : line.rindex("</")]
+        _, has_opening_tag, rest = line.partition(">")
+        value, has_closing_tag, _ = rest.rpartition("</")
+        if not (
+            has_opening_tag
+            and has_closing_tag
+            and cls._is_opening_tag(line, element)
+            and cls._is_closing_tag(line, element)
+        ):
+            raise Exception(
+                f"Expected <{element}>...</{element}>, instead line was: '{line}'."
+            )
+        return value
 
     @classmethod
     def _extract_value_multiline(
-        cls, lines: Iterator[str], element: str
+        cls, line: str, lines: Iterator[str], element: str
     ) -> Optional[str]:
-        line = next(lines)
         cls._assert_opening_tag(line, element)
-        closing_tag = "</" + element + ">"
-
-        stripped_line = line.rstrip()
-        if stripped_line.endswith("/>"):  # <text bytes="0" />
+        if cls._is_self_closing_tag(line):  # <text bytes="0" />
             return None
-        elif stripped_line.endswith(closing_tag):
+        elif cls._is_closing_tag(line, element):
             return cls._extract_value(line, element)
 
         value = [line[line.index(">") + 1 :]]
@@ -336,6 +457,28 @@ class WikidataDumpPagesMetaHistory(WikidataDumpFile):
             value.append(line)
         return "".join(value)
 
+    @classmethod
+    def _skip_value_multiline(
+        cls, line: str, lines: Iterator[str], element: str
+    ) -> None:
+        cls._assert_opening_tag(line, element)
+        if cls._is_self_closing_tag(line) or cls._is_closing_tag(line, element):
+            return
+        for line in lines:
+            if cls._is_closing_tag(line, element):
+                break
+
     @classmethod
     def _unescape_xml(cls, value: str) -> str:
-        return unescape(value, entities={"&quot;": '"'})
+        # Most values contain no entities at all. For the others, chained str.replace()
+        # calls are faster than a regex substitution with a replacement callback, since
+        # entity-heavy JSON texts would invoke the callback for every quote. "&amp;"
+        # has to be replaced last, as in xml.sax.saxutils.unescape().
+        if "&" not in value:
+            return value
+        return (
+            value.replace("&lt;", "<")
+            .replace("&gt;", ">")
+            .replace("&quot;", '"')
+            .replace("&amp;", "&")
+        )
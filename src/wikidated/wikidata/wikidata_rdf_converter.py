@@ -14,10 +14,12 @@
 # limitations under the License.
 #
 
-from typing import NamedTuple, Optional, Sequence
+from sys import intern
+from typing import Callable, MutableMapping, NamedTuple, Optional, Sequence
 
 from jpype import JClass, JException, JObject  # type: ignore
 from marisa_trie import Trie  # type: ignore
+from typing_extensions import Final
 
 from wikidated._utils import JvmManager
 from wikidated.wikidata.wikidata_dump_pages_meta_history import WikidataRawRevision
@@ -63,6 +65,13 @@ WIKIDATA_RDF_PREFIXES = {
 }
 _WIKIDATA_RDF_PREFIXES_TRIE = Trie(WIKIDATA_RDF_PREFIXES.keys())
 
+# The same IRIs (e.g., predicates like wdt:P31 or objects like wd:Q5) occur in a lot of
+# revisions. We therefore cache the prefixed forms of IRIs, which also makes all triples
+# share the same string objects for them. The cache is cleared once it reaches its
+# maximum size, so that unique IRIs (e.g., statement IDs) can not fill up memory.
+_PREFIXED_IRI_CACHE: Final[MutableMapping[str, str]] = {}
+_PREFIXED_IRI_CACHE_MAX_SIZE: Final = 2 ** 16
+
 
 class WikidataRdfTriple(NamedTuple):
     subject: str
@@ -123,6 +132,8 @@ class WikidataRdfConversionError(Exception):
 
 
 class WikidataRdfConverter:
+    _REDIRECT_SEARCH_LENGTH: Final = 128
+
     def __init__(
         self, sites_table: WikidataDumpSitesTable, jvm_manager: JvmManager
     ) -> None:
@@ -131,11 +142,41 @@ class WikidataRdfConverter:
             "org.wikidata.wdtk.datamodel.helpers.JsonDeserializer"
         )(JClass("org.wikidata.wdtk.datamodel.helpers.Datamodel").SITE_WIKIDATA)
 
+        # Reuse the same output stream for all conversions, so that its buffer only has
+        # to grow once instead of being allocated again for each revision. Closing a
+        # ByteArrayOutputStream has no effect, so it stays usable after each conversion.
+        self._wdtk_output_stream = JClass("java.io.ByteArrayOutputStream")(2 ** 16)
+
         # Lookup Java classes needed to access WDTK's RDF serialization.
-        self._wdtk_output_stream = JClass("java.io.ByteArrayOutputStream")
         self._wdtk_rdf_writer = JClass("org.wikidata.wdtk.rdf.RdfWriter")
         self._wdtk_rdf_converter = JClass("org.wikidata.wdtk.rdf.RdfConverter")
 
+        # Lookup Java classes of documents and constants needed for the conversion
+        # once, so that converting a revision does not have to resolve them again.
+        self._wdtk_item_document = JClass(
+            "org.wikidata.wdtk.datamodel.implementation.ItemDocumentImpl"
+        )
+        self._wdtk_property_document = JClass(
+            "org.wikidata.wdtk.datamodel.implementation.PropertyDocumentImpl"
+        )
+        self._wdtk_entity_redirect_document = JClass(
+            "org.wikidata.wdtk.datamodel.implementation.EntityRedirectDocumentImpl"
+        )
+        self._wdtk_wb_item = self._wdtk_rdf_writer.WB_ITEM
+        self._wdtk_wb_property = self._wdtk_rdf_writer.WB_PROPERTY
+        self._wdtk_owl_same_as = (
+            JClass("org.eclipse.rdf4j.model.impl.SimpleValueFactory")
+            .getInstance()
+            .createIRI("http://www.w3.org/2002/07/owl#sameAs")
+        )
+        self._wdtk_document_writers: Final[
+            MutableMapping[type, Callable[[JObject, JObject, JObject, JObject], None]]
+        ] = {
+            self._wdtk_item_document: self._write_item_document,
+            self._wdtk_property_document: self._write_property_document,
+            self._wdtk_entity_redirect_document: self._write_entity_redirect_document,
+        }
+
         # Load objects that are needed to construct the above classes.
         self._wdtk_ntriples_format = JClass("org.eclipse.rdf4j.rio.RDFFormat").NTRIPLES
         self._wdtk_sites = self._load_wdtk_sites(sites_table)
@@ -167,7 +208,8 @@ class WikidataRdfConverter:
         # TODO: document that RdfConverter basically only adds the "TASK filtering" on
         #  top of AbstractRdfConverter.
 
-        wdtk_output_stream = self._wdtk_output_stream()
+        wdtk_output_stream = self._wdtk_output_stream
+        wdtk_output_stream.reset()
         wdtk_rdf_writer = self._wdtk_rdf_writer(
             self._wdtk_ntriples_format, wdtk_output_stream
         )
@@ -184,56 +226,20 @@ class WikidataRdfConverter:
             wdtk_rdf_converter.writeBasicDeclarations()
 
         wdtk_document = self._load_wdtk_document(revision)
-        wdtk_document_class = str(wdtk_document.getClass().getSimpleName())
-        wdtk_resource = wdtk_rdf_writer.getUri(wdtk_document.getEntityId().getIri())
-
-        if wdtk_document_class not in (
-            "ItemDocumentImpl",
-            "PropertyDocumentImpl",
-            "EntityRedirectDocumentImpl",
-        ):
+        wdtk_document_writer = self._find_wdtk_document_writer(wdtk_document)
+        if wdtk_document_writer is None:
             raise WikidataRdfConversionError(
-                f"RDF serialization of {wdtk_document_class} not implemented.", revision
+                f"RDF serialization of {wdtk_document.getClass().getSimpleName()} not "
+                "implemented.",
+                revision,
             )
 
-        try:
-            if wdtk_document_class == "ItemDocumentImpl":
-                wdtk_rdf_converter.writeDocumentType(
-                    wdtk_resource, wdtk_rdf_writer.WB_ITEM
-                )
-                wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
-                wdtk_rdf_converter.writeStatements(wdtk_document)
-                wdtk_rdf_converter.writeSiteLinks(
-                    wdtk_resource, wdtk_document.getSiteLinks()
-                )
-
-            elif wdtk_document_class == "PropertyDocumentImpl":
-                wdtk_rdf_converter.writeDocumentType(
-                    wdtk_resource, wdtk_rdf_writer.WB_PROPERTY
-                )
-                wdtk_rdf_converter.writePropertyDatatype(wdtk_document)
-                wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
-                wdtk_rdf_converter.writeStatements(wdtk_document)
-                wdtk_rdf_converter.writeInterPropertyLinks(wdtk_document)
-
-            elif wdtk_document_class == "EntityRedirectDocumentImpl":
-                # TODO: document that revisions that contain the "redirect" field in
-                #  their JSON indicate that the respective entity is being redirected to
-                #  the target entity starting from that point in time. Additionally, if
-                #  an entity is ever the source of a redirect all revisions of it will
-                #  also carry the revision.redirect attribute indicating the target of
-                #  the redirect, even if at that time the entity is not yet being
-                #  redirect.
-                # The following representation of redirects as owl:sameAs triples is not
-                # done by WDTK. In fact, WDTK does not represent redirects in RDF at
-                # all. We choose to use owl:sameAs here on the basis that the Wikidata
-                # Query Service also uses it to represent redirects.
-                wdtk_rdf_writer.writeTripleUriObject(
-                    wdtk_document.getEntityId().getIri(),
-                    wdtk_rdf_writer.getUri("http://www.w3.org/2002/07/owl#sameAs"),
-                    wdtk_document.getTargetId().getIri(),
-                )
+        wdtk_resource = wdtk_rdf_writer.getUri(wdtk_document.getEntityId().getIri())
 
+        try:
+            wdtk_document_writer(
+                wdtk_document, wdtk_resource, wdtk_rdf_writer, wdtk_rdf_converter
+            )
         except JException as e:
             raise WikidataRdfConversionError(
                 "RDF serialization by Wikidata Toolkit failed.", revision, e
@@ -251,7 +257,13 @@ class WikidataRdfConverter:
 
         wdtk_rdf_writer.finish()
 
-        return WikidataRdfRevision(
+        # Copy the serialized bytes via the buffer protocol and decode them in Python,
+        # instead of decoding them to a Java string that then has to be converted.
+        ntriples = bytes(wdtk_output_stream.toByteArray()).decode("UTF-8")
+
+        # All values are already of their correct types, so skip pydantic's
+        # validation which would otherwise check each triple of the revision.
+        return WikidataRdfRevision.construct(
             entity_id=revision.entity_id,
             page_id=revision.page_id,
             namespace=revision.namespace,
@@ -266,16 +278,89 @@ class WikidataRdfConverter:
             wikibase_model=revision.wikibase_model,
             wikibase_format=revision.wikibase_format,
             sha1=revision.sha1,
-            triples=self._parse_ntriples(str(wdtk_output_stream)),
+            triples=self._parse_ntriples(ntriples),
+        )
+
+    def _find_wdtk_document_writer(
+        self, wdtk_document: JObject
+    ) -> Optional[Callable[[JObject, JObject, JObject, JObject], None]]:
+        # Dispatching via the Python type of the JPype proxy is a single dictionary
+        # lookup, instead of checking the type on the Java side for each document class.
+        wdtk_document_type = type(wdtk_document)
+        wdtk_document_writer = self._wdtk_document_writers.get(wdtk_document_type)
+        if wdtk_document_writer is not None:
+            return wdtk_document_writer
+
+        # Should JPype return a proxy of another class (e.g., a subclass), fall back to
+        # an isinstance() check and remember the result for further documents.
+        for wdtk_document_class, wdtk_document_writer in list(
+            self._wdtk_document_writers.items()
+        ):
+            if isinstance(wdtk_document, wdtk_document_class):
+                self._wdtk_document_writers[wdtk_document_type] = wdtk_document_writer
+                return wdtk_document_writer
+        return None
+
+    def _write_item_document(
+        self,
+        wdtk_document: JObject,
+        wdtk_resource: JObject,
+        _wdtk_rdf_writer: JObject,
+        wdtk_rdf_converter: JObject,
+    ) -> None:
+        wdtk_rdf_converter.writeDocumentType(wdtk_resource, self._wdtk_wb_item)
+        wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
+        wdtk_rdf_converter.writeStatements(wdtk_document)
+        wdtk_rdf_converter.writeSiteLinks(wdtk_resource, wdtk_document.getSiteLinks())
+
+    def _write_property_document(
+        self,
+        wdtk_document: JObject,
+        wdtk_resource: JObject,
+        _wdtk_rdf_writer: JObject,
+        wdtk_rdf_converter: JObject,
+    ) -> None:
+        wdtk_rdf_converter.writeDocumentType(wdtk_resource, self._wdtk_wb_property)
+        wdtk_rdf_converter.writePropertyDatatype(wdtk_document)
+        wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
+        wdtk_rdf_converter.writeStatements(wdtk_document)
+        wdtk_rdf_converter.writeInterPropertyLinks(wdtk_document)
+
+    def _write_entity_redirect_document(
+        self,
+        wdtk_document: JObject,
+        _wdtk_resource: JObject,
+        wdtk_rdf_writer: JObject,
+        _wdtk_rdf_converter: JObject,
+    ) -> None:
+        # TODO: document that revisions that contain the "redirect" field in their JSON
+        #  indicate that the respective entity is being redirected to the target entity
+        #  starting from that point in time. Additionally, if an entity is ever the
+        #  source of a redirect all revisions of it will also carry the
+        #  revision.redirect attribute indicating the target of the redirect, even if
+        #  at that time the entity is not yet being redirect.
+        # The following representation of redirects as owl:sameAs triples is not done
+        # by WDTK. In fact, WDTK does not represent redirects in RDF at all. We choose
+        # to use owl:sameAs here on the basis that the Wikidata Query Service also uses
+        # it to represent redirects.
+        wdtk_rdf_writer.writeTripleUriObject(
+            wdtk_document.getEntityId().getIri(),
+            self._wdtk_owl_same_as,
+            wdtk_document.getTargetId().getIri(),
         )
 
     def _load_wdtk_document(self, revision: WikidataRawRevision) -> JObject:
         if revision.text is None:
             raise WikidataRdfConversionError("Entity has not text.", revision)
 
-        # The following is based on WDTK's WikibaseRevisionProcessor.
+        # The following is based on WDTK's WikibaseRevisionProcessor. The model of a
+        # revision can not be used to detect redirects, as they are still stored as
+        # "wikibase-item" or "wikibase-property". However, a redirect's JSON only
+        # consists of the fields "entity" and "redirect" (e.g.,
+        # {"entity":"Q1","redirect":"Q2"}), so instead of scanning the whole JSON of an
+        # entity (which may be hundreds of kilobytes large) we only search its start.
         try:
-            if '"redirect":' in revision.text:
+            if revision.text.find('"redirect":', 0, self._REDIRECT_SEARCH_LENGTH) != -1:
                 return self._wdtk_json_deserializer.deserializeEntityRedirectDocument(
                     revision.text
                 )
@@ -320,6 +405,16 @@ class WikidataRdfConverter:
         if iri[0] != "<":  # If IRI starts with a "<" it also ends with a ">".
             return iri  # Argument is not an IRI.
 
+        prefixed_iri = _PREFIXED_IRI_CACHE.get(iri)
+        if prefixed_iri is None:
+            if len(_PREFIXED_IRI_CACHE) >= _PREFIXED_IRI_CACHE_MAX_SIZE:
+                _PREFIXED_IRI_CACHE.clear()
+            prefixed_iri = intern(cls._prefix_ntriples_iri_uncached(iri))
+            _PREFIXED_IRI_CACHE[iri] = prefixed_iri
+        return prefixed_iri
+
+    @classmethod
+    def _prefix_ntriples_iri_uncached(cls, iri: str) -> str:
         # iri[1:-1] is the uri without the angle brackets.
         prefix_iris = _WIKIDATA_RDF_PREFIXES_TRIE.prefixes(iri[1:-1])
         if prefix_iris:
@@ -14,10 +14,17 @@
 # limitations under the License.
 #
 
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
 from pydantic import BaseModel as PydanticModel
+from pydantic import validator
+from typing_extensions import Final
+
+_TIMESTAMP_PATTERN: Final = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(?:Z|[+-][0-9]{2}:[0-9]{2})"
+)
 
 
 class WikidataEntityMetadata(PydanticModel):
@@ -58,6 +65,23 @@ class WikidataRevisionBase(PydanticModel):
     wikibase_format: str
     sha1: Optional[str]
 
+    @validator("timestamp", pre=True)
+    def _parse_timestamp(  # noqa: N805
+        cls, value: Union[str, datetime]
+    ) -> Union[str, datetime]:
+        # Timestamps are serialized like "2012-10-29T17:36:53+00:00", which
+        # datetime.fromisoformat() parses far faster than pydantic's own parser. As the
+        # formats accepted by fromisoformat() differ between Python versions, only
+        # exactly this format is parsed here and all others are left to pydantic.
+        if isinstance(value, str) and _TIMESTAMP_PATTERN.fullmatch(value):
+            if value[-1] == "Z":  # Only supported by fromisoformat() from Python 3.11.
+                value = value[:-1] + "+00:00"
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return value
+
     def entity_metadata(self) -> WikidataEntityMetadata:
         return WikidataEntityMetadata(
             entity_id=self.entity_id,
@@ -66,6 +66,10 @@ class WikidatedGenericDataset(
         _T_WikidatedGlobalStream_co,
     ]
 ):
+    _DUMP_VERSION_PATTERN = re.compile(
+        r".*(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2}).*"
+    )
+
     def __init__(
         self,
         dataset_dir: Path,
@@ -91,9 +95,7 @@ class WikidatedGenericDataset(
     def load_custom(cls, dataset_dir: Path) -> WikidatedDataset:
         _LOGGER.debug(f"Loading dataset {dataset_dir.name}.")
 
-        match = re.match(
-            r".*(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2}).*", dataset_dir.name
-        )
+        match = cls._DUMP_VERSION_PATTERN.match(dataset_dir.name)
         dump_version = (
             date(
                 year=int(match["year"]),
@@ -20,6 +20,7 @@ import re
 from datetime import datetime, timezone
 from itertools import chain, groupby
 from logging import getLogger
+from operator import attrgetter
 from pathlib import Path
 from shutil import rmtree
 from sys import maxsize
@@ -31,6 +32,7 @@ from typing import (
     Mapping,
     MutableSet,
     Optional,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -44,6 +46,7 @@ from wikidated._utils import (
     ParallelizeUpdateProgressFunc,
     RangeMap,
     SevenZipArchive,
+    json_dumps,
     parallelize,
 )
 from wikidated.wikidata import (
@@ -60,6 +63,11 @@ _LOGGER = getLogger(__name__)
 
 
 class WikidatedEntityStreamsFile:
+    _ARCHIVE_PATH_PATTERN = re.compile(
+        r"^(?P<dataset_dir_name>.+)-entity-streams"
+        r"-p(?P<min_page_id>\d+)-p(?P<max_page_id>\d+)\.7z$"
+    )
+
     def __init__(self, archive_path: Path, page_ids: range) -> None:
         self.archive_path: Final = archive_path
         self.page_ids: Final = page_ids
@@ -88,7 +96,7 @@ class WikidatedEntityStreamsFile:
             self._make_archive_component_path(page_id) if page_id else None
         ) as fd:
             for line in fd:
-                revision = WikidatedRevision.parse_raw(line)
+                revision = WikidatedRevision.parse_json_line(line)
                 if (
                     revision.revision_id < min_revision_id_
                     or revision.timestamp < min_timestamp_
@@ -126,11 +134,7 @@ class WikidatedEntityStreamsFile:
 
     @classmethod
     def _parse_archive_path(cls, path: Path) -> Tuple[Path, range]:
-        match = re.match(
-            r"^(?P<dataset_dir_name>.+)-entity-streams"
-            r"-p(?P<min_page_id>\d+)-p(?P<max_page_id>\d+).7z$",
-            path.name,
-        )
+        match = cls._ARCHIVE_PATH_PATTERN.match(path.name)
         assert match
 
         dataset_dir = path.parent.resolve()
@@ -144,10 +148,12 @@ class WikidatedEntityStreamsFile:
 
     @classmethod
     def _parse_archive_component_path(cls, path: Path) -> int:
-        match = re.match(r"p(?P<page_id>\d+).jsonl", path.name)
-        assert match
+        # Slicing is cheaper than matching a regex, and this is called for each of the
+        # (up to hundreds of thousands) components of an archive.
+        name = path.name
+        assert name.startswith("p") and name.endswith(".jsonl")
 
-        page_id = int(match["page_id"])
+        page_id = int(name[1:-6])  # Strip "p" and ".jsonl".
         return page_id
 
     @classmethod
@@ -197,7 +203,7 @@ class WikidatedEntityStreamsFile:
 
         for page_id, revisions in groupby(
             pages_meta_history.iter_revisions(display_progress_bar=False),
-            lambda revision: revision.page_id,
+            attrgetter("page_id"),
         ):
             wikidated_revisions = cls._iter_wikidated_revisions(
                 revisions, rdf_converter
@@ -223,7 +229,10 @@ class WikidatedEntityStreamsFile:
                 for wikidated_revision in chain(
                     (first_wikidated_revision,), wikidated_revisions
                 ):
-                    fd.write(wikidated_revision.json() + "\n")
+                    # Serializing the (shallow) dict of the revision directly is much
+                    # faster than pydantic's .json(), which first recursively copies
+                    # the whole revision via .dict().
+                    fd.write(json_dumps(dict(wikidated_revision)) + "\n")
                     yield wikidated_revision
 
         SevenZipArchive.from_dir_with_order(
@@ -242,23 +251,34 @@ class WikidatedEntityStreamsFile:
         rdf_converter: WikidataRdfConverter,
     ) -> Iterator[WikidatedRevision]:
         state: MutableSet[WikidataRdfTriple] = set()
+        state_sha1: Optional[str] = None
 
         for revision in revisions:
-            try:
-                rdf_revision = rdf_converter(revision)
-            except WikidataRdfConversionError:
-                _LOGGER.debug(
-                    f"RDF conversion error for revision {revision.revision_id}.",
-                    exc_info=True,
-                )
-                continue
+            triple_deletions: Sequence[WikidataRdfTriple] = []
+            triple_additions: Sequence[WikidataRdfTriple] = []
+
+            # If the text of a revision is the same as that of the last converted one
+            # (e.g., for null edits), so are its triples. We can then skip the RDF
+            # conversion and the computation of the differences.
+            if revision.sha1 is None or revision.sha1 != state_sha1:
+                try:
+                    rdf_revision = rdf_converter(revision)
+                except WikidataRdfConversionError:
+                    _LOGGER.debug(
+                        f"RDF conversion error for revision {revision.revision_id}.",
+                        exc_info=True,
+                    )
+                    continue
 
-            triples_set = set(rdf_revision.triples)
-            triple_deletions = sorted(state - triples_set)
-            triple_additions = sorted(triples_set - state)
-            state = triples_set
+                triples_set = set(rdf_revision.triples)
+                triple_deletions = sorted(state - triples_set)
+                triple_additions = sorted(triples_set - state)
+                state = triples_set
+                state_sha1 = revision.sha1
 
-            yield WikidatedRevision(
+            # All values are already of their correct types, so skip pydantic's
+            # validation which would otherwise check each triple of the revision.
+            yield WikidatedRevision.construct(
                 entity_id=revision.entity_id,
                 page_id=revision.page_id,
                 namespace=revision.namespace,
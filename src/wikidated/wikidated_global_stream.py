@@ -21,6 +21,7 @@ import re
 from datetime import date, datetime, timedelta, timezone
 from itertools import chain, takewhile
 from logging import getLogger
+from operator import attrgetter
 from pathlib import Path
 from shutil import rmtree
 from sys import maxsize
@@ -43,6 +44,7 @@ from wikidated._utils import (
     RangeMap,
     SevenZipArchive,
     days_between_dates,
+    json_dumps,
     months_between_dates,
     next_month,
 )
@@ -54,6 +56,16 @@ _LOGGER = getLogger(__name__)
 
 
 class WikidatedGlobalStreamFile:
+    _ARCHIVE_PATH_PATTERN = re.compile(
+        r"^(?P<dataset_dir_name>.+)-global-stream"
+        r"-d(?P<year>\d{4})(?P<month>\d{2})"
+        r"-r(?P<min_revision_id>\d+)-r(?P<max_revision_id>\d+)\.7z$"
+    )
+    _ARCHIVE_COMPONENT_PATH_PATTERN = re.compile(
+        r"d(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})"
+        r"-r(?P<min_revision_id>\d+)-r(?P<max_revision_id>\d+)\.jsonl$"
+    )
+
     def __init__(self, archive_path: Path, month: date, revision_ids: range) -> None:
         self.archive_path: Final = archive_path
         self.month: Final = month
@@ -84,7 +96,7 @@ class WikidatedGlobalStreamFile:
             max_timestamp_ = max_timestamp_.replace(tzinfo=timezone.utc)
         with archive.read() as fd:
             for line in fd:
-                revision = WikidatedRevision.parse_raw(line)
+                revision = WikidatedRevision.parse_json_line(line)
                 if (
                     revision.revision_id < min_revision_id_
                     or revision.timestamp < min_timestamp_
@@ -113,12 +125,7 @@ class WikidatedGlobalStreamFile:
 
     @classmethod
     def _parse_archive_path(cls, path: Path) -> Tuple[Path, date, range]:
-        match = re.match(
-            r"^(?P<dataset_dir_name>.+)-global-stream"
-            r"-d(?P<year>\d{4})(?P<month>\d{2})"
-            r"-r(?P<min_revision_id>\d+)-r(?P<max_revision_id>\d+).7z$",
-            path.name,
-        )
+        match = cls._ARCHIVE_PATH_PATTERN.match(path.name)
         assert match
 
         dataset_dir = path.parent.resolve()
@@ -137,11 +144,7 @@ class WikidatedGlobalStreamFile:
 
     @classmethod
     def _parse_archive_component_path(cls, path: Path) -> Tuple[date, range]:
-        match = re.match(
-            r"d(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})"
-            r"-r(?P<min_revision_id>\d+)-r(?P<max_revision_id>\d+).jsonl$",
-            path.name,
-        )
+        match = cls._ARCHIVE_COMPONENT_PATH_PATTERN.match(path.name)
         assert match
 
         day = date(
@@ -250,7 +253,7 @@ class WikidatedGlobalStreamFile:
                     else revision_ids_of_day.start,
                     revision.revision_id + 1,
                 )
-                fd.write(revision.json() + "\n")
+                fd.write(json_dumps(dict(revision)) + "\n")
 
         if revision_ids_of_day is None:
             # No revisions for this day existed.
@@ -383,7 +386,7 @@ class WikidatedGenericGlobalStream(Generic[_T_WikidatedGlobalStreamFile_co]):
             for sorted_entity_streams_file in sorted_entity_streams
         ]
         sorted_revisions = iter(
-            heapq.merge(*sorted_entity_streams_iters, key=lambda rev: rev.revision_id)
+            heapq.merge(*sorted_entity_streams_iters, key=attrgetter("revision_id"))
         )
 
         files_by_months = RangeMap[WikidatedGlobalStreamFile]()
@@ -14,11 +14,35 @@
 # limitations under the License.
 #
 
-from typing import Sequence
+from __future__ import annotations
 
+from datetime import datetime
+from typing import Sequence, Union
+
+from wikidated._utils import json_loads
 from wikidated.wikidata import WikidataRdfTriple, WikidataRevisionBase
 
 
 class WikidatedRevision(WikidataRevisionBase):
     triple_deletions: Sequence[WikidataRdfTriple]
     triple_additions: Sequence[WikidataRdfTriple]
+
+    @classmethod
+    def parse_json_line(cls, line: Union[str, bytes]) -> WikidatedRevision:
+        """Parse a line of Wikidated's entity streams or global stream.
+
+        The line is trusted and NOT validated, so only use this on lines written by
+        Wikidated itself and use ``parse_raw()`` for any external data.
+        """
+        # As stream lines are only written by us, we skip pydantic's validation (which
+        # would otherwise check each triple of the revision) and only convert the
+        # values that are not native to JSON.
+        values = json_loads(line)
+        values["timestamp"] = datetime.fromisoformat(values["timestamp"])
+        values["triple_deletions"] = [
+            WikidataRdfTriple(*triple) for triple in values["triple_deletions"]
+        ]
+        values["triple_additions"] = [
+            WikidataRdfTriple(*triple) for triple in values["triple_additions"]
+        ]
+        return cls.construct(**values)
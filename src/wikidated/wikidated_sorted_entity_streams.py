@@ -19,6 +19,7 @@ from __future__ import annotations
 import re
 from datetime import datetime, timezone
 from logging import getLogger
+from operator import attrgetter
 from pathlib import Path
 from sys import maxsize
 from typing import (
@@ -36,7 +37,7 @@ from typing import (
 from tqdm import tqdm  # type: ignore
 from typing_extensions import Final
 
-from wikidated._utils import RangeMap, SevenZipArchive
+from wikidated._utils import RangeMap, SevenZipArchive, json_dumps
 from wikidated.wikidated_entity_streams import (
     WikidatedEntityStreams,
     WikidatedEntityStreamsFile,
@@ -47,6 +48,11 @@ _LOGGER = getLogger(__name__)
 
 
 class WikidatedSortedEntityStreamsFile:
+    _ARCHIVE_PATH_PATTERN = re.compile(
+        r"^(?P<dataset_dir_name>.+)-sorted-entity-streams"
+        r"-p(?P<min_page_id>\d+)-p(?P<max_page_id>\d+)\.7z$"
+    )
+
     def __init__(self, archive_path: Path, page_ids: range) -> None:
         self.archive_path: Final = archive_path
         self.page_ids: Final = page_ids
@@ -72,7 +78,7 @@ class WikidatedSortedEntityStreamsFile:
             max_timestamp_ = max_timestamp_.replace(tzinfo=timezone.utc)
         with archive.read() as fd:
             for line in fd:
-                revision = WikidatedRevision.parse_raw(line)
+                revision = WikidatedRevision.parse_json_line(line)
                 if (
                     revision.revision_id < min_revision_id_
                     or revision.timestamp < min_timestamp_
@@ -98,11 +104,7 @@ class WikidatedSortedEntityStreamsFile:
 
     @classmethod
     def _parse_archive_path(cls, path: Path) -> Tuple[Path, range]:
-        match = re.match(
-            r"^(?P<dataset_dir_name>.+)-sorted-entity-streams"
-            r"-p(?P<min_page_id>\d+)-p(?P<max_page_id>\d+).7z$",
-            path.name,
-        )
+        match = cls._ARCHIVE_PATH_PATTERN.match(path.name)
         assert match
 
         dataset_dir = path.parent.resolve()
@@ -129,10 +131,10 @@ class WikidatedSortedEntityStreamsFile:
             _LOGGER.debug(f"Building sorted entity streams file {archive_path.name}.")
             tmp_path = archive_path.parent / ("tmp." + archive_path.name)
             revisions = list(entity_streams_file.iter_revisions())
-            revisions.sort(key=lambda rev: rev.revision_id)
+            revisions.sort(key=attrgetter("revision_id"))
             with SevenZipArchive(tmp_path).write() as fd:
                 for revision in revisions:
-                    fd.write(revision.json() + "\n")
+                    fd.write(json_dumps(dict(revision)) + "\n")
             tmp_path.rename(archive_path)
             _LOGGER.debug(
                 f"Done building sorted entity streams file {archive_path.name}."
@@ -25,7 +25,12 @@ from typing import Iterator, Optional
 
 from tqdm import tqdm  # type: ignore
 
-from wikidated._utils import RangeMap, download_file_with_progressbar, hashcheck
+from wikidated._utils import (
+    RangeMap,
+    download_file_with_progressbar,
+    hashcheck,
+    hashcompare,
+)
 from wikidated.wikidated_dataset import WikidatedGenericDataset
 from wikidated.wikidated_entity_streams import (
     WikidatedEntityStreamsFile,
@@ -79,8 +84,9 @@ class _WikidatedV1_0FileDownload:  # noqa: N801
         )
         self.path.parent.mkdir(exist_ok=True, parents=True)
         path_tmp = self.path.parent / ("tmp." + self.path.name)
-        download_file_with_progressbar(url, path_tmp, description=self.path.name)
-        hashcheck(path_tmp, calc_sha1(), self.sha1)
+        h = calc_sha1()
+        download_file_with_progressbar(url, path_tmp, description=self.path.name, h=h)
+        hashcompare(path_tmp, h, self.sha1)
         path_tmp.rename(self.path)
         _LOGGER.debug(f"Done downloading Wikidated 1.0 dump file '{self.path.name}'.")
         self._downloaded = True
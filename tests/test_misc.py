@@ -0,0 +1,103 @@
+#
+# Copyright 2021-2022 Lukas Schmelzeisen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from pathlib import Path
+from typing import Iterator, Mapping, Optional
+
+import pytest
+from pytest import MonkeyPatch
+
+from wikidated._utils import download_file_in_parts_with_progressbar, http_session
+
+_DATA = bytes(range(256)) * 100
+_URL = "https://example.org/file"
+
+
+class _MockResponse:
+    def __init__(
+        self, status_code: int, content: bytes, headers: Mapping[str, str]
+    ) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+def _mock_server(
+    monkeypatch: MonkeyPatch,
+    *,
+    accept_ranges: bool = True,
+    honor_ranges: bool = True,
+    part_size_delta: int = 0,
+) -> None:
+    def head(url: str, allow_redirects: bool) -> _MockResponse:
+        headers = {"content-length": str(len(_DATA))}
+        if accept_ranges:
+            headers["accept-ranges"] = "bytes"
+        return _MockResponse(200, b"", headers)
+
+    def get(
+        url: str, headers: Optional[Mapping[str, str]] = None, stream: bool = False
+    ) -> _MockResponse:
+        if headers is None or not honor_ranges:
+            return _MockResponse(200, _DATA, {"content-length": str(len(_DATA))})
+        start, stop = map(int, headers["Range"][len("bytes=") :].split("-"))
+        content = _DATA[start : stop + 1 + part_size_delta]
+        return _MockResponse(206, content, {"content-length": str(len(content))})
+
+    monkeypatch.setattr(http_session, "head", head)
+    monkeypatch.setattr(http_session, "get", get)
+
+
+def test_download_file_in_parts(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    _mock_server(monkeypatch)
+    dest = tmp_path / "file"
+    download_file_in_parts_with_progressbar(
+        _URL, dest, num_parts=3, display_progress_bar=False
+    )
+    assert dest.read_bytes() == _DATA
+
+
+@pytest.mark.parametrize("accept_ranges,honor_ranges", [(False, False), (True, False)])
+def test_download_file_in_parts_fallback(
+    monkeypatch: MonkeyPatch, tmp_path: Path, accept_ranges: bool, honor_ranges: bool
+) -> None:
+    _mock_server(monkeypatch, accept_ranges=accept_ranges, honor_ranges=honor_ranges)
+    dest = tmp_path / "file"
+    download_file_in_parts_with_progressbar(
+        _URL, dest, num_parts=3, display_progress_bar=False
+    )
+    assert dest.read_bytes() == _DATA
+
+
+def test_download_file_in_parts_short_part(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    _mock_server(monkeypatch, part_size_delta=-1)
+    with pytest.raises(Exception, match="Size mismatch"):
+        download_file_in_parts_with_progressbar(
+            _URL, tmp_path / "file", num_parts=3, display_progress_bar=False
+        )
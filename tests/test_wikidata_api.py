@@ -0,0 +1,92 @@
+#
+# Copyright 2021-2022 Lukas Schmelzeisen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from typing import Mapping, Optional, Sequence
+
+import orjson
+import pytest
+import requests
+from pytest import MonkeyPatch
+
+from wikidated._utils import http_session
+from wikidated.wikidata import WikidataApi, WikidataEntityMetadata
+
+_ENTITIES = {
+    "Q1": {"id": "Q1", "pageid": 129, "ns": 0, "title": "Q1"},
+    "Q2": {"id": "Q2", "pageid": 130, "ns": 0, "title": "Q2"},
+}
+
+
+def _mock_wbgetentities(
+    monkeypatch: MonkeyPatch, *, error_code: Optional[str] = None
+) -> Sequence[str]:
+    # Mimics wbgetentities with redirects=no: redirected (or otherwise unknown) entity
+    # IDs are reported as missing, while a malformed entity ID fails the whole request.
+    requested_ids = []
+
+    def post(url: str, data: Mapping[str, str]) -> requests.Response:
+        assert data["action"] == "wbgetentities"
+        assert data["redirects"] == "no"
+        ids = data["ids"].split("|")
+        requested_ids.append(data["ids"])
+
+        if error_code is not None:
+            content = {"error": {"code": error_code, "info": "Error."}}
+        elif any(not id_[1:].isdigit() for id_ in ids):
+            content = {"error": {"code": "no-such-entity", "info": "Invalid id."}}
+        else:
+            content = {
+                "success": 1,
+                "entities": {
+                    id_: _ENTITIES.get(id_, {"id": id_, "missing": ""}) for id_ in ids
+                },
+            }
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = orjson.dumps(content)
+        return response
+
+    monkeypatch.setattr(http_session, "post", post)
+    return requested_ids
+
+
+def test_query_entity_ids_redirected(monkeypatch: MonkeyPatch) -> None:
+    requested_ids = _mock_wbgetentities(monkeypatch)
+    assert list(WikidataApi.query_entity_ids(["Q1", "Q3", "Q2"])) == [
+        WikidataEntityMetadata(entity_id="Q1", page_id=129, namespace=0),
+        None,
+        WikidataEntityMetadata(entity_id="Q2", page_id=130, namespace=0),
+    ]
+    assert requested_ids == ["Q1|Q3|Q2"]
+
+
+def test_query_entity_ids_invalid(monkeypatch: MonkeyPatch) -> None:
+    requested_ids = _mock_wbgetentities(monkeypatch)
+    assert list(WikidataApi.query_entity_ids(["Q1", "Qx", "Q2"])) == [
+        WikidataEntityMetadata(entity_id="Q1", page_id=129, namespace=0),
+        None,
+        WikidataEntityMetadata(entity_id="Q2", page_id=130, namespace=0),
+    ]
+    assert requested_ids == ["Q1|Qx|Q2", "Q1", "Qx", "Q2"]
+
+
+def test_query_entity_ids_error(monkeypatch: MonkeyPatch) -> None:
+    requested_ids = _mock_wbgetentities(monkeypatch, error_code="maxlag")
+    with pytest.raises(Exception, match="maxlag"):
+        list(WikidataApi.query_entity_ids(["Q1", "Q2"]))
+    assert requested_ids == ["Q1|Q2"]
@@ -0,0 +1,113 @@
+#
+# Copyright 2021-2022 Lukas Schmelzeisen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, MutableSequence, Optional
+
+from pytest import MonkeyPatch
+
+import wikidated.wikidata.wikidata_api_cache
+from wikidated.wikidata import (
+    WikidataApi,
+    WikidataApiCache,
+    WikidataEntityMetadata,
+    WikidataRevisionBase,
+)
+
+_ENTITY = WikidataEntityMetadata(entity_id="Q1", page_id=129, namespace=0)
+_REVISION = WikidataRevisionBase(
+    entity_id="Q1",
+    page_id=129,
+    namespace=0,
+    revision_id=16,
+    parent_revision_id=None,
+    timestamp=datetime(2012, 10, 29, 17, 3, 21, tzinfo=timezone.utc),
+    contributor="Example",
+    contributor_id=1,
+    is_minor=False,
+    comment=None,
+    wikibase_model="wikibase-item",
+    wikibase_format="application/json",
+    sha1="0123456789abcdef0123456789abcdef01234567",
+)
+
+
+def _mock_time(monkeypatch: MonkeyPatch, value: float) -> None:
+    monkeypatch.setattr(wikidated.wikidata.wikidata_api_cache, "time", lambda: value)
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    with WikidataApiCache(tmp_path / "cache.sqlite3") as cache:
+        cache.put_many("entity_ids", {"Q1": _ENTITY})
+        cache.put_many("revision_ids", {"16": _REVISION})
+        assert cache.get_many("entity_ids", ["Q1", "Q2"], WikidataEntityMetadata) == {
+            "Q1": _ENTITY
+        }
+        assert cache.get_many("revision_ids", ["16"], WikidataRevisionBase) == {
+            "16": _REVISION
+        }
+        assert cache.get_many("page_ids", ["Q1"], WikidataEntityMetadata) == {}
+
+    # Results persist across connections.
+    with WikidataApiCache(tmp_path / "cache.sqlite3") as cache:
+        assert cache.get_many("entity_ids", ["Q1"], WikidataEntityMetadata) == {
+            "Q1": _ENTITY
+        }
+
+
+def test_ttl(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    with WikidataApiCache(tmp_path / "cache.sqlite3", ttl=timedelta(hours=1)) as cache:
+        _mock_time(monkeypatch, 1_000_000.0)
+        cache.put_many("entity_ids", {"Q1": _ENTITY})
+        cache.put_many("revision_ids", {"16": _REVISION})
+
+        _mock_time(monkeypatch, 1_000_000.0 + 30 * 60)
+        assert cache.get_many("entity_ids", ["Q1"], WikidataEntityMetadata) == {
+            "Q1": _ENTITY
+        }
+
+        # Mutable endpoints expire, while revision IDs never do.
+        _mock_time(monkeypatch, 1_000_000.0 + 2 * 60 * 60)
+        assert cache.get_many("entity_ids", ["Q1"], WikidataEntityMetadata) == {}
+        assert cache.get_many("revision_ids", ["16"], WikidataRevisionBase) == {
+            "16": _REVISION
+        }
+
+
+def test_none_not_stored(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    queried_ids: MutableSequence[str] = []
+
+    def query_entity_ids(
+        entity_ids: Iterable[str],
+    ) -> Iterator[Optional[WikidataEntityMetadata]]:
+        for entity_id in entity_ids:
+            queried_ids.append(entity_id)
+            yield _ENTITY if entity_id == "Q1" else None
+
+    monkeypatch.setattr(WikidataApi, "_query_entity_ids", query_entity_ids)
+    with WikidataApiCache(tmp_path / "cache.sqlite3") as cache:
+        for _ in range(2):
+            assert list(WikidataApi.query_entity_ids(["Q1", "Q2"], cache=cache)) == [
+                _ENTITY,
+                None,
+            ]
+        assert cache.get_many("entity_ids", ["Q1", "Q2"], WikidataEntityMetadata) == {
+            "Q1": _ENTITY
+        }
+    # Q1 is served from the cache the second time, but the missing Q2 is not cached.
+    assert queried_ids == ["Q1", "Q2", "Q2"]
@@ -0,0 +1,187 @@
+#
+# Copyright 2021-2022 Lukas Schmelzeisen
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import gzip
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import pytest
+from jpype import JClass  # type: ignore
+from pytest import TempPathFactory
+
+from wikidated._utils import JvmManager
+from wikidated.wikidata import (
+    WikidataDumpSitesTable,
+    WikidataRawRevision,
+    WikidataRdfConversionError,
+    WikidataRdfConverter,
+    WikidataRdfRevision,
+    WikidataRdfTriple,
+)
+
+# Converting revisions requires a JVM with the Java dependencies of Wikidated, which
+# can be downloaded via WikidatedManager.download_java_dependencies().
+_JARS_DIR = os.environ.get("WIKIDATED_JARS_DIR")
+pytestmark = pytest.mark.skipif(
+    not _JARS_DIR, reason="WIKIDATED_JARS_DIR is not set to a directory of jars."
+)
+
+_ITEM = (
+    '{"type":"item","id":"Q42","labels":{"en":{"language":"en","value":"Douglas '
+    'Adams"}},"descriptions":{},"aliases":{},"claims":{},"sitelinks":{}}'
+)
+_PROPERTY = (
+    '{"type":"property","datatype":"wikibase-item","id":"P31","labels":{"en":'
+    '{"language":"en","value":"instance of"}},"descriptions":{},"aliases":{},'
+    '"claims":{}}'
+)
+_LEXEME = (
+    '{"type":"lexeme","id":"L1","lemmas":{"en":{"language":"en","value":"first"}},'
+    '"lexicalCategory":"Q1084","language":"Q1860","claims":{},"forms":[],"senses":[]}'
+)
+_REDIRECT = '{"entity":"Q1","redirect":"Q2"}'
+
+
+@pytest.fixture(scope="module")
+def converter(tmp_path_factory: TempPathFactory) -> Iterator[WikidataRdfConverter]:
+    assert _JARS_DIR
+    sites_table_path = (
+        tmp_path_factory.mktemp("dumpfiles") / "wikidatawiki-20210601-sites.sql.gz"
+    )
+    with gzip.open(sites_table_path, "wb"):
+        pass
+    sites_table = WikidataDumpSitesTable(path=sites_table_path, url="", sha1="", size=0)
+    with JvmManager(jars_dir=Path(_JARS_DIR)) as jvm_manager:
+        yield WikidataRdfConverter(sites_table, jvm_manager)
+
+
+def _revision(
+    entity_id: str, text: str, wikibase_model: str, redirect: Optional[str] = None
+) -> WikidataRawRevision:
+    return WikidataRawRevision(
+        entity_id=entity_id,
+        page_id=1,
+        namespace=0,
+        redirect=redirect,
+        revision_id=1,
+        parent_revision_id=None,
+        timestamp=datetime(2012, 10, 29, 17, 3, 21, tzinfo=timezone.utc),
+        contributor="Example",
+        contributor_id=1,
+        is_minor=False,
+        comment=None,
+        wikibase_model=wikibase_model,
+        wikibase_format="application/json",
+        sha1="0123456789abcdef0123456789abcdef01234567",
+        text=text,
+    )
+
+
+def test_convert_item(converter: WikidataRdfConverter) -> None:
+    triples = converter(_revision("Q42", _ITEM, "wikibase-item")).triples
+    assert WikidataRdfTriple("wd:Q42", "rdf:type", "wikibase:Item") in triples
+    assert WikidataRdfTriple("wd:Q42", "rdfs:label", '"Douglas Adams"@en') in triples
+
+
+def test_convert_property(converter: WikidataRdfConverter) -> None:
+    triples = converter(_revision("P31", _PROPERTY, "wikibase-property")).triples
+    assert WikidataRdfTriple("wd:P31", "rdf:type", "wikibase:Property") in triples
+    assert (
+        WikidataRdfTriple("wd:P31", "wikibase:propertyType", "wikibase:WikibaseItem")
+        in triples
+    )
+
+
+def test_convert_redirect(converter: WikidataRdfConverter) -> None:
+    revision = _revision("Q1", _REDIRECT, "wikibase-item", redirect="Q2")
+    assert converter(revision).triples == [
+        WikidataRdfTriple("wd:Q1", "owl:sameAs", "wd:Q2")
+    ]
+
+
+def test_convert_lexeme(converter: WikidataRdfConverter) -> None:
+    with pytest.raises(WikidataRdfConversionError, match="not implemented"):
+        converter(_revision("L1", _LEXEME, "wikibase-lexeme"))
+
+
+def _convert_reference(
+    converter: WikidataRdfConverter, revision: WikidataRawRevision
+) -> Sequence[WikidataRdfTriple]:
+    # Serializes the revision like the original implementation did: to a new output
+    # stream for each document that is then converted to a Java string.
+    wdtk_output_stream = JClass("java.io.ByteArrayOutputStream")()
+    wdtk_rdf_writer = JClass("org.wikidata.wdtk.rdf.RdfWriter")(
+        JClass("org.eclipse.rdf4j.rio.RDFFormat").NTRIPLES, wdtk_output_stream
+    )
+    wdtk_rdf_writer.start()
+    wdtk_rdf_converter = JClass("org.wikidata.wdtk.rdf.RdfConverter")(
+        wdtk_rdf_writer, converter._wdtk_sites, converter._wdtk_property_register
+    )
+    wdtk_rdf_converter.setTasks(2**31 - 1)
+
+    wdtk_document = converter._load_wdtk_document(revision)
+    wdtk_document_class = str(wdtk_document.getClass().getSimpleName())
+    wdtk_resource = wdtk_rdf_writer.getUri(wdtk_document.getEntityId().getIri())
+    if wdtk_document_class == "ItemDocumentImpl":
+        wdtk_rdf_converter.writeDocumentType(wdtk_resource, wdtk_rdf_writer.WB_ITEM)
+        wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
+        wdtk_rdf_converter.writeStatements(wdtk_document)
+        wdtk_rdf_converter.writeSiteLinks(wdtk_resource, wdtk_document.getSiteLinks())
+    elif wdtk_document_class == "PropertyDocumentImpl":
+        wdtk_rdf_converter.writeDocumentType(wdtk_resource, wdtk_rdf_writer.WB_PROPERTY)
+        wdtk_rdf_converter.writePropertyDatatype(wdtk_document)
+        wdtk_rdf_converter.writeDocumentTerms(wdtk_document)
+        wdtk_rdf_converter.writeStatements(wdtk_document)
+        wdtk_rdf_converter.writeInterPropertyLinks(wdtk_document)
+    elif wdtk_document_class == "EntityRedirectDocumentImpl":
+        wdtk_rdf_writer.writeTripleUriObject(
+            wdtk_document.getEntityId().getIri(),
+            wdtk_rdf_writer.getUri("http://www.w3.org/2002/07/owl#sameAs"),
+            wdtk_document.getTargetId().getIri(),
+        )
+    wdtk_rdf_writer.finish()
+
+    return converter._parse_ntriples(str(wdtk_output_stream))
+
+
+def test_convert_matches_reference(converter: WikidataRdfConverter) -> None:
+    revisions = [
+        _revision("Q42", _ITEM, "wikibase-item"),
+        _revision("P31", _PROPERTY, "wikibase-property"),
+        _revision("Q1", _REDIRECT, "wikibase-item", redirect="Q2"),
+    ]
+    # Convert each revision twice and in between others, so that output left over in
+    # the reused output stream would show up.
+    for revision in revisions + revisions:
+        rdf_revision = converter(revision)
+        # The converter constructs its result without validation, so compare it with a
+        # validated revision, including the types of all fields.
+        reference_rdf_revision = WikidataRdfRevision(
+            **revision.dict(exclude={"text"}),
+            triples=_convert_reference(converter, revision),
+        )
+        assert rdf_revision == reference_rdf_revision
+        assert {field: type(value) for field, value in rdf_revision} == {
+            field: type(value) for field, value in reference_rdf_revision
+        }
+        # Compare as plain tuples, as triples with blank nodes compare equal
+        # regardless of their objects.
+        assert list(map(tuple, rdf_revision.triples)) == list(
+            map(tuple, reference_rdf_revision.triples)
+        )